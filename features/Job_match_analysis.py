@@ -1,62 +1,271 @@
+import os
 import re
-import nltk
-from nltk.corpus import stopwords
+import threading
+from collections import Counter
+from itertools import repeat
 import numpy as np
-from scipy.spatial.distance import cosine
-import pickle
 
+from features.stopwords import ENGLISH_STOPWORDS
+from features.glove_store import store_exists, load_glove_store, convert_pickle_to_store, load_idf
+
+
+GLOVE_PICKLE_PATH = os.getenv("GLOVE_PICKLE_PATH", "glove_model.pkl")
+GLOVE_STORE_DIR = os.getenv("GLOVE_STORE_DIR", "glove_store")
+
+# "mean": unweighted mean vector of the whole resume.
+# "idf": IDF-weighted vectors of fixed-size resume chunks, max-pooled.
+ATS_MODES = ("mean", "idf")
+ATS_CHUNK_TOKENS = int(os.getenv("ATS_CHUNK_TOKENS", "80"))
+
+# Keyword coverage: how many top JD terms to report on, and the cosine
+# similarity at which a different resume term counts as covering one.
+ATS_KEYWORD_COUNT = int(os.getenv("ATS_KEYWORD_COUNT", "10"))
+KEYWORD_MATCH_THRESHOLD = float(os.getenv("KEYWORD_MATCH_THRESHOLD", "0.7"))
 
 glove_model = None
+glove_failed = False
+_glove_lock = threading.Lock()
 
 def get_glove_model():
-    global glove_model
-    if glove_model is None:
-        with open("glove_model.pkl", "rb") as f:
-            glove_model = pickle.load(f)
+    """
+    Returns the memory-mapped GloVe store, converting the legacy pickle
+    if the store has not been built yet. main.py calls this at startup so
+    the conversion never runs on the request path.
+
+    Returns None when no vectors are available (missing or unreadable
+    pickle, unwritable store directory); the failure is logged once and
+    not retried, and scoring falls back to Jaccard similarity.
+    """
+    global glove_model, glove_failed
+    if glove_model is None and not glove_failed:
+        with _glove_lock:
+            if glove_model is None and not glove_failed:
+                try:
+                    if not store_exists(GLOVE_STORE_DIR):
+                        if not os.path.exists(GLOVE_PICKLE_PATH):
+                            return None
+                        convert_pickle_to_store(GLOVE_PICKLE_PATH, GLOVE_STORE_DIR)
+                    glove_model = load_glove_store(GLOVE_STORE_DIR)
+                except Exception as e:
+                    glove_failed = True
+                    print(f"GloVe vectors unavailable, using Jaccard scoring: {type(e).__name__}: {e}")
     return glove_model
 
+idf_table = None
 
+def get_idf_table(model):
+    """
+    IDF weights aligned with the GloVe vocabulary, from `idf.npy` in the
+    store (see features.idf_table). Without one, falls back to log(rank):
+    GloVe vocabularies are sorted by corpus frequency, so by Zipf's law
+    the rank approximates inverse document frequency.
+    """
+    global idf_table
+    if idf_table is None:
+        idf_table = load_idf(GLOVE_STORE_DIR, len(model))
+        if idf_table is None:
+            idf_table = np.log(np.arange(2, len(model) + 2, dtype=np.float32))
+    return idf_table
 
-try:
-    stop_words = set(stopwords.words('english'))
-except LookupError:
-    nltk.download('stopwords')
-    stop_words = set(stopwords.words('english'))
+
+
+stop_words = ENGLISH_STOPWORDS
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
 
 def pre_process_corrected(text):
-  text = text.lower()
-  text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
+  text = _NON_ALNUM_RE.sub('', text.lower())
   words = text.split()
   words = [word for word in words if word not in stop_words]
   return words
 
+_stopword_masks = {}
+
+def get_stopword_mask(model):
+    """Stopwords as a boolean mask in the model's vocabulary-ID space (built once per model)."""
+    mask = _stopword_masks.get(id(model))
+    if mask is None:
+        mask = _stopword_masks[id(model)] = model.vocab_mask(stop_words)
+    return mask
+
+def tokenize_to_ids(text, model):
+    """
+    Same tokens as pre_process_corrected, mapped straight to vocabulary IDs:
+    one regex pass, one dict probe per word, and stopword / out-of-vocabulary
+    filtering done on the ID array instead of on strings.
+    """
+    words = _NON_ALNUM_RE.sub('', text.lower()).split()
+    ids = np.fromiter(map(model.key_to_index.get, words, repeat(-1, len(words))), dtype=np.intp, count=len(words))
+    ids = ids[ids >= 0]
+    return ids[~get_stopword_mask(model)[ids]]
+
+def get_token_indices(processed_tokens, model):
+    """Maps tokens to embedding row indices, dropping out-of-vocabulary tokens."""
+    indices = map(model.get_index, processed_tokens)
+    return np.fromiter((i for i in indices if i >= 0), dtype=np.intp)
+
+def get_document_matrix(token_lists, model):
+    """Mean embedding of every token list as one (n_docs, vector_size) matrix."""
+    return get_id_matrix([get_token_indices(tokens, model) for tokens in token_lists], model)
+
+def get_id_matrix(index_arrays, model, weights=None):
+    """
+    Mean embedding of every vocabulary-ID array, optionally weighted by a
+    per-token array aligned with the vocabulary (e.g. IDF). All rows are
+    gathered from the store in a single fancy-index pass and reduced per
+    document with np.add.reduceat.
+    """
+    counts = np.array([len(a) for a in index_arrays], dtype=np.intp)
+
+    matrix = np.zeros((len(index_arrays), model.vector_size), dtype=np.float64)
+    non_empty = counts > 0
+    if non_empty.any():
+        ids = np.concatenate(index_arrays)
+        rows = model.vectors[ids]
+        starts = (np.cumsum(counts) - counts)[non_empty]
+        if weights is None:
+            totals = counts[non_empty]
+        else:
+            token_weights = weights[ids]
+            rows = rows * token_weights[:, None]
+            totals = np.add.reduceat(token_weights, starts, dtype=np.float64)
+        sums = np.add.reduceat(rows, starts, axis=0, dtype=np.float64)
+        matrix[non_empty] = np.divide(
+            sums, totals[:, None], out=np.zeros_like(sums), where=totals[:, None] > 0
+        )
+    return matrix
+
 def get_document_vector(processed_tokens, model):
-  vectors = [model[token] for token in processed_tokens if token in model]
-  if not vectors:
-      return np.zeros(model.vector_size)
-  return np.mean(vectors, axis=0)
+  return get_document_matrix([processed_tokens], model)[0]
+
+def cosine_scores(document_matrix, target_vector):
+    """ATS scores (0-100) of every row against one vector via a single matrix-vector product."""
+    norms = np.linalg.norm(document_matrix, axis=1) * np.linalg.norm(target_vector)
+    similarities = np.divide(
+        document_matrix @ target_vector, norms,
+        out=np.zeros(len(document_matrix)), where=norms > 0
+    )
+    return np.round(similarities * 100, 2)
+
+def chunk_ids(ids, chunk_tokens):
+    """Splits an ID array into near-equal chunks of at most `chunk_tokens` IDs (at least one chunk)."""
+    return np.array_split(ids, max(1, -(-len(ids) // chunk_tokens)))
+
+def idf_chunk_scores(description_ids, resume_id_arrays, model, chunk_tokens=ATS_CHUNK_TOKENS):
+    """
+    Long-document mode: every resume is cut into chunks, all chunks of all
+    resumes are scored against the IDF-weighted JD vector in one pass, and
+    each resume keeps its best chunk (max-pooling).
+    """
+    idf = get_idf_table(model)
+    target = get_id_matrix([description_ids], model, idf)[0]
+
+    chunks = [chunk_ids(ids, chunk_tokens) for ids in resume_id_arrays]
+    counts = np.array([len(c) for c in chunks], dtype=np.intp)
+    scores = cosine_scores(get_id_matrix([c for cs in chunks for c in cs], model, idf), target)
+    return np.maximum.reduceat(scores, np.cumsum(counts) - counts)
+
+def jaccard_score(resume_tokens, description_tokens):
+    resume_set = set(resume_tokens)
+    description_set = set(description_tokens)
+    if not description_set:
+        return 0.0
+    intersection = resume_set.intersection(description_set)
+    union = resume_set.union(description_set)
+    similarity_score = len(intersection) / len(union)
+    return round(similarity_score * 100, 2)
+
+def normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros(matrix.shape), where=norms > 0)
+
+def keyword_coverage(resume_ids, description_ids, model, top_n=ATS_KEYWORD_COUNT, threshold=KEYWORD_MATCH_THRESHOLD):
+    """
+    Top JD terms (count x IDF) split into those the resume covers and those
+    it misses. A term is covered by the same token, or by any resume token
+    within `threshold` cosine, resolved with one (terms x resume vocabulary)
+    similarity matrix.
+    """
+    terms, counts = np.unique(description_ids, return_counts=True)
+    top = terms[np.argsort(-(counts * get_idf_table(model)[terms]), kind="stable")[:top_n]]
+
+    resume_terms = np.unique(resume_ids)
+    covered = np.isin(top, resume_terms)
+    if len(resume_terms) and not covered.all():
+        pending = top[~covered]
+        similarities = normalize_rows(model.vectors[pending]) @ normalize_rows(model.vectors[resume_terms]).T
+        covered[~covered] = similarities.max(axis=1) >= threshold
+
+    keys = model.index_to_key
+    return [keys[i] for i in top[covered]], [keys[i] for i in top[~covered]]
+
+def _score_ids(description_ids, resume_id_arrays, model, mode):
+    if mode == "idf":
+        return idf_chunk_scores(description_ids, resume_id_arrays, model)
+    matrix = get_id_matrix([description_ids, *resume_id_arrays], model)
+    return cosine_scores(matrix[1:], matrix[0])
+
+def calculate_ats_scores(resume_texts, job_description_text, mode="mean"):
+    """Scores many resumes against one job description, in input order."""
+    if mode not in ATS_MODES:
+        raise ValueError(f"Unknown ATS mode '{mode}', expected one of {ATS_MODES}")
 
-def calculate_ats_score(resume_text, job_description_text):
-    preprocessed_resume_text = pre_process_corrected(resume_text)
-    preprocessed_description_text = pre_process_corrected(job_description_text)
-    
     glove_model = get_glove_model()
 
+    if glove_model:
+        description_ids = tokenize_to_ids(job_description_text, glove_model)
+        resume_id_arrays = [tokenize_to_ids(text, glove_model) for text in resume_texts]
+        return [float(score) for score in _score_ids(description_ids, resume_id_arrays, glove_model, mode)]
+
+    # Fallback: Jaccard Similarity
+    preprocessed_resumes = [pre_process_corrected(text) for text in resume_texts]
+    preprocessed_description_text = pre_process_corrected(job_description_text)
+    return [jaccard_score(tokens, preprocessed_description_text) for tokens in preprocessed_resumes]
+
+def rank_ats_scores(resume_texts, job_description_text, mode="mean"):
+    """Returns [{"index", "score"}] sorted from best to worst match."""
+    scores = calculate_ats_scores(resume_texts, job_description_text, mode)
+    ranked = sorted(enumerate(scores), key=lambda item: item[1], reverse=True)
+    return [{"index": index, "score": score} for index, score in ranked]
+
+def calculate_ats_score(resume_text, job_description_text, mode="mean"):
+    return calculate_ats_scores([resume_text], job_description_text, mode)[0]
+
+def ats_report(resume_text, job_description_text, mode="mean"):
+    """
+    ATS score plus keyword coverage ({"score", "covered", "missing"}),
+    tokenizing each text once and with no LLM call.
+    """
+    if mode not in ATS_MODES:
+        raise ValueError(f"Unknown ATS mode '{mode}', expected one of {ATS_MODES}")
+
+    glove_model = get_glove_model()
 
     if glove_model:
-        resume_vector = get_document_vector(preprocessed_resume_text, glove_model)
-        job_description_vector = get_document_vector(preprocessed_description_text, glove_model)
-        similarity_score = 1 - cosine(resume_vector, job_description_vector)
-        ats_score = round(similarity_score * 100, 2)
-    else:
-        # Fallback: Jaccard Similarity
-        resume_set = set(preprocessed_resume_text)
-        description_set = set(preprocessed_description_text)
-        if not description_set:
-            return 0.0
-        intersection = resume_set.intersection(description_set)
-        union = resume_set.union(description_set)
-        similarity_score = len(intersection) / len(union)
-        ats_score = round(similarity_score * 100, 2)
-
-    return ats_score
+        description_ids = tokenize_to_ids(job_description_text, glove_model)
+        resume_ids = tokenize_to_ids(resume_text, glove_model)
+        score = float(_score_ids(description_ids, [resume_ids], glove_model, mode)[0])
+        covered, missing = keyword_coverage(resume_ids, description_ids, glove_model)
+        return {"score": score, "covered": covered, "missing": missing}
+
+    # Fallback: exact token overlap on the most frequent JD terms
+    resume_tokens = pre_process_corrected(resume_text)
+    description_tokens = pre_process_corrected(job_description_text)
+    resume_set = set(resume_tokens)
+    top = [term for term, _ in Counter(description_tokens).most_common(ATS_KEYWORD_COUNT)]
+    return {
+        "score": jaccard_score(resume_tokens, description_tokens),
+        "covered": [term for term in top if term in resume_set],
+        "missing": [term for term in top if term not in resume_set],
+    }
+
+def describe_coverage(report):
+    """Human-readable ATS `details` lines for an ats_report result."""
+    details = []
+    if report["covered"]:
+        details.append("Covers key job terms: " + ", ".join(report["covered"]))
+    if report["missing"]:
+        details.append("Missing key job terms: " + ", ".join(report["missing"]))
+    if not details:
+        details.append("No scorable keywords found in the job description")
+    return details
@@ -0,0 +1,158 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+def make_cache_key(*parts) -> str:
+    """Content-addressed key: SHA-256 over the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class MemoryCache:
+    """In-process cache with a TTL per entry and LRU eviction."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class MongoCache:
+    """
+    MongoDB-backed cache shared by all workers. Expiry is handled by a TTL
+    index on `expires_at`; `last_used` is refreshed on every hit so the
+    least recently used documents are trimmed once `max_entries` is exceeded.
+    """
+
+    def __init__(self, collection, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._index_ready = False
+
+    async def _ensure_index(self):
+        if not self._index_ready:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            await self.collection.create_index("last_used")
+            self._index_ready = True
+
+    async def get(self, key):
+        now = datetime.utcnow()
+        doc = await self.collection.find_one_and_update(
+            {"_id": key, "expires_at": {"$gt": now}},
+            {"$set": {"last_used": now}},
+        )
+        if doc is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return doc["value"]
+
+    async def set(self, key, value):
+        await self._ensure_index()
+        now = datetime.utcnow()
+        await self.collection.replace_one(
+            {"_id": key},
+            {
+                "value": value,
+                "last_used": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds),
+            },
+            upsert=True,
+        )
+
+        overflow = await self.collection.estimated_document_count() - self.max_entries
+        if overflow > 0:
+            cursor = self.collection.find({}, {"_id": 1}).sort("last_used", 1).limit(overflow)
+            stale_ids = [doc["_id"] async for doc in cursor]
+            await self.collection.delete_many({"_id": {"$in": stale_ids}})
+
+    def stats(self) -> dict:
+        return {
+            "backend": "mongo",
+            "collection": self.collection.name,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task, so
+    N identical requests arriving together trigger a single upstream fetch.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled caller does not cancel the shared fetch.
+        return await asyncio.shield(task)
+
+
+def create_cache(name: str, max_entries: int, ttl_seconds: float):
+    """
+    Builds the cache backend selected by the CACHE_BACKEND env var
+    ("memory" by default, or "mongo" for a collection shared across workers).
+    """
+    backend = os.getenv("CACHE_BACKEND", "memory").lower()
+
+    if backend == "mongo":
+        from database import db
+        return MongoCache(db[f"cache_{name}"], max_entries, ttl_seconds)
+
+    if backend != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+    return MemoryCache(max_entries, ttl_seconds)
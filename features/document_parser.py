@@ -0,0 +1,145 @@
+import io
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PyPDF2 import PdfReader
+import docx
+
+
+# Hard per-document budgets: pages beyond MAX_PAGES are ignored and the
+# whole extraction is abandoned after EXTRACTION_TIMEOUT_SECONDS.
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "30"))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("RESUME_EXTRACTION_TIMEOUT_SECONDS", "20"))
+
+# PDFs longer than this are split into page ranges parsed in parallel.
+PAGES_PER_TASK = int(os.getenv("RESUME_PAGES_PER_TASK", "4"))
+EXTRACTION_WORKERS = int(os.getenv("RESUME_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool = None
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Bounded pool created on first use; spawned so workers never inherit the event loop."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def recycle_process_pool(pool: ProcessPoolExecutor):
+    """
+    Kills the workers of a pool that may be stuck on a pathological file;
+    the next extraction builds a fresh pool. Cancelling the asyncio future
+    alone would leave the parse running and the worker occupied.
+    """
+    global _pool
+    if _pool is pool:
+        _pool = None
+    # ProcessPoolExecutor has no public way to stop a running task.
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def is_pdf(filename: str) -> bool:
+    return filename.lower().endswith(".pdf")
+
+
+def is_docx(filename: str) -> bool:
+    return filename.lower().endswith(".docx")
+
+
+def pdf_page_count(content: bytes) -> int:
+    return len(PdfReader(io.BytesIO(content)).pages)
+
+
+def extract_pdf_pages(content: bytes, start: int = 0, stop: int = None) -> str:
+    reader = PdfReader(io.BytesIO(content))
+    parts = []
+    for page in reader.pages[start:stop]:
+        page_text = page.extract_text()
+        if page_text:
+            parts.append(page_text)
+            # Form feed between pages, so compaction can spot per-page headers and footers.
+            parts.append("\n\f")
+    return "".join(parts)
+
+
+def extract_docx_text(content: bytes) -> str:
+    document = docx.Document(io.BytesIO(content))
+    return "".join(para.text + "\n" for para in document.paragraphs)
+
+
+def extract_text_from_bytes(filename: str, content: bytes) -> str:
+    """In-process extraction with the same page budget as the pooled path."""
+    if is_pdf(filename):
+        return extract_pdf_pages(content, 0, MAX_PAGES)
+
+    if is_docx(filename):
+        return extract_docx_text(content)
+
+    raise ValueError("Unsupported file type. Please upload PDF or DOCX.")
+
+
+async def _extract_in_pool(pool: ProcessPoolExecutor, filename: str, content: bytes) -> str:
+    loop = asyncio.get_running_loop()
+
+    if is_docx(filename):
+        return await loop.run_in_executor(pool, extract_docx_text, content)
+
+    page_count = min(await loop.run_in_executor(pool, pdf_page_count, content), MAX_PAGES)
+    if page_count <= PAGES_PER_TASK:
+        return await loop.run_in_executor(pool, extract_pdf_pages, content, 0, page_count)
+
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(pool, extract_pdf_pages, content, start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ))
+    return "".join(parts)
+
+
+async def extract_text_async(filename: str, content: bytes) -> str:
+    """
+    Extracts resume text in the process pool so heavy PDFs never block the
+    event loop or the request threadpool. Long PDFs fan out per page range.
+    """
+    if not (is_pdf(filename) or is_docx(filename)):
+        raise ValueError("Unsupported file type. Please upload PDF or DOCX.")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + EXTRACTION_TIMEOUT_SECONDS
+
+    for attempt in range(2):
+        pool = get_process_pool()
+        try:
+            return await asyncio.wait_for(
+                _extract_in_pool(pool, filename, content), max(0.0, deadline - loop.time())
+            )
+        except asyncio.TimeoutError:
+            recycle_process_pool(pool)
+            raise ExtractionTimeout(
+                f"Resume extraction exceeded {EXTRACTION_TIMEOUT_SECONDS:g}s"
+            )
+        except BrokenProcessPool:
+            # Another upload's timeout recycled the pool, or a worker died
+            # (OOM kill, crash). Replace the pool if it is still the current
+            # one, then retry once on a fresh pool within the same budget.
+            recycle_process_pool(pool)
+            if attempt:
+                raise
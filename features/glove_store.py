@@ -0,0 +1,149 @@
+import os
+import pickle
+import tempfile
+import numpy as np
+
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.txt"
+IDF_FILE = "idf.npy"
+
+
+class GloveStore:
+    """
+    Read-only GloVe lookup backed by a memory-mapped float32 matrix.
+
+    Exposes the same `model[token]`, `token in model` and `vector_size`
+    interface as the pickled gensim KeyedVectors it replaces, so every
+    worker maps the same file instead of holding its own copy.
+    """
+
+    def __init__(self, vectors, index_to_key):
+        self.vectors = vectors
+        self.index_to_key = index_to_key
+        self.key_to_index = {key: i for i, key in enumerate(index_to_key)}
+        self.vector_size = vectors.shape[1]
+
+    def __getitem__(self, token):
+        return self.vectors[self.key_to_index[token]]
+
+    def __contains__(self, token):
+        return token in self.key_to_index
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+    def get_index(self, token, default=-1):
+        return self.key_to_index.get(token, default)
+
+    def vocab_mask(self, tokens):
+        """Boolean array over the vocabulary, True at the IDs of `tokens`."""
+        mask = np.zeros(len(self.index_to_key), dtype=bool)
+        mask[[self.key_to_index[t] for t in tokens if t in self.key_to_index]] = True
+        return mask
+
+
+def store_exists(store_dir: str) -> bool:
+    return (
+        os.path.exists(os.path.join(store_dir, VECTORS_FILE))
+        and os.path.exists(os.path.join(store_dir, VOCAB_FILE))
+    )
+
+
+def load_glove_store(store_dir: str) -> GloveStore:
+    """Memory-maps a store written by `convert_pickle_to_store`."""
+    vectors = np.load(os.path.join(store_dir, VECTORS_FILE), mmap_mode="r")
+
+    with open(os.path.join(store_dir, VOCAB_FILE), "r", encoding="utf-8") as f:
+        index_to_key = f.read().split("\n")
+
+    if len(index_to_key) != vectors.shape[0]:
+        raise ValueError(
+            f"GloVe store at '{store_dir}' is inconsistent: "
+            f"{len(index_to_key)} tokens for {vectors.shape[0]} vectors"
+        )
+
+    return GloveStore(vectors, index_to_key)
+
+
+def load_idf(store_dir: str, vocab_size: int):
+    """Memory-maps the IDF table aligned with the store's vocabulary, or None if absent or stale."""
+    path = os.path.join(store_dir, IDF_FILE)
+    if not os.path.exists(path):
+        return None
+
+    idf = np.load(path, mmap_mode="r")
+    if idf.shape != (vocab_size,):
+        print(f"Ignoring IDF table at '{path}': {idf.shape[0]} weights for {vocab_size} tokens")
+        return None
+    return idf
+
+
+def _temp_file(path: str):
+    """Opens a uniquely named temporary file next to `path`; returns (file, temp_path)."""
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp"
+    )
+    return os.fdopen(fd, "wb"), temp_path
+
+
+def save_idf(store_dir: str, idf) -> None:
+    path = os.path.join(store_dir, IDF_FILE)
+    f, temp_path = _temp_file(path)
+    with f:
+        np.save(f, np.ascontiguousarray(idf, dtype=np.float32))
+    os.replace(temp_path, path)
+
+
+def _unpack_model(model):
+    # gensim KeyedVectors
+    if hasattr(model, "index_to_key") and hasattr(model, "vectors"):
+        return list(model.index_to_key), np.asarray(model.vectors, dtype=np.float32)
+
+    # plain {token: vector} dict
+    if isinstance(model, dict):
+        keys = list(model.keys())
+        vectors = np.vstack([np.asarray(model[k], dtype=np.float32) for k in keys])
+        return keys, vectors
+
+    raise TypeError(f"Unsupported GloVe model type: {type(model).__name__}")
+
+
+def convert_pickle_to_store(pickle_path: str, store_dir: str) -> None:
+    """
+    One-time conversion of the pickled GloVe model into a float32 matrix
+    plus a newline-separated vocabulary. Files are written under temporary
+    names and renamed into place, so concurrent writers never see a
+    half-written store or clobber each other's files.
+    """
+    with open(pickle_path, "rb") as f:
+        model = pickle.load(f)
+
+    keys, vectors = _unpack_model(model)
+
+    os.makedirs(store_dir, exist_ok=True)
+
+    vectors_path = os.path.join(store_dir, VECTORS_FILE)
+    vocab_path = os.path.join(store_dir, VOCAB_FILE)
+
+    f, vectors_temp = _temp_file(vectors_path)
+    with f:
+        np.save(f, np.ascontiguousarray(vectors, dtype=np.float32))
+
+    f, vocab_temp = _temp_file(vocab_path)
+    with f:
+        f.write("\n".join(keys).encode("utf-8"))
+
+    os.replace(vectors_temp, vectors_path)
+    os.replace(vocab_temp, vocab_path)
+
+
+if __name__ == "__main__":
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "glove_model.pkl"
+    target = sys.argv[2] if len(sys.argv) > 2 else "glove_store"
+
+    convert_pickle_to_store(source, target)
+    store = load_glove_store(target)
+    print(f"✅ Wrote {len(store)} vectors of size {store.vector_size} to {target}/")
@@ -0,0 +1,39 @@
+import os
+import numpy as np
+
+from features.glove_store import save_idf
+from features.Job_match_analysis import GLOVE_STORE_DIR, get_glove_model, tokenize_to_ids
+
+
+def build_idf_table(texts, model) -> np.ndarray:
+    """
+    Smoothed IDF, log((1 + N) / (1 + df)) + 1, for every token in the
+    model's vocabulary, counted over `texts` in vocabulary-ID space.
+    """
+    doc_ids = [np.unique(tokenize_to_ids(text, model)) for text in texts]
+    n_docs = len(doc_ids)
+    df = np.bincount(np.concatenate(doc_ids or [np.zeros(0, dtype=np.intp)]), minlength=len(model))
+    return (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+
+def read_corpus(corpus_dir: str):
+    """Yields the contents of every .txt file under `corpus_dir`, one document per file."""
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if name.endswith(".txt"):
+                with open(os.path.join(root, name), "r", encoding="utf-8", errors="ignore") as f:
+                    yield f.read()
+
+
+if __name__ == "__main__":
+    # Offline build: python -m features.idf_table corpus_dir/
+    # where corpus_dir holds resumes and job descriptions as .txt files.
+    import sys
+
+    model = get_glove_model()
+    if model is None:
+        sys.exit("GloVe store not found; build it first with python -m features.glove_store")
+
+    idf = build_idf_table(read_corpus(sys.argv[1]), model)
+    save_idf(GLOVE_STORE_DIR, idf)
+    print(f"✅ Wrote IDF weights for {len(idf)} tokens to {GLOVE_STORE_DIR}/")
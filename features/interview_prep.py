@@ -1,24 +1,15 @@
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage
 
-
-load_dotenv()
+from features import llm_client
+from features.json_stream import JsonArrayStream
+from features.semantic_cache import partition_key
 
 
 # hf_api_key = os.getenv('huggingface_api_key')
 
 # client = InferenceClient("meta-llama/Llama-3-70B-Instruct", token=hf_api_key)
 
-os.environ["GEMINI_API_KEY"] = os.getenv("gemini_api_key")
-
-model = init_chat_model("google_genai:gemini-2.5-flash")
-
-
-
-def generate_interview_questions(role, skills):
-    """Generates interview questions and returns a clean list of strings."""
+def interview_messages(role, skills):
     skills_str = ", ".join(skills)
     prompt = f"""
     You are an expert AI interview question generator. For the job role "{role}" with skills "{skills_str}", generate 20 relevant interview questions in four categories: DSA & Core CS, Technical Skills, Role-Specific, and HR.
@@ -42,16 +33,59 @@ def generate_interview_questions(role, skills):
     #     print(f"⚠️ LLM Error (interview_questions): {e}")
     #     return ["Could not generate interview questions at this time."]
 
-    try:
-        response = model.invoke([
-            SystemMessage(content="You are a helpful assistant."),
-            HumanMessage(content=prompt)
-        ])
+    return [
+        SystemMessage(content="You are a helpful assistant."),
+        HumanMessage(content=prompt)
+    ]
 
-        return response.content
 
-    except Exception as e:
-        return f"⚠️ Error generating response: {str(e)}"
+def generate_interview_questions(role, skills):
+    """Generates interview questions and returns the raw LLM response."""
+    return llm_client.invoke("interview_prep", interview_messages(role, skills))
+
+
+async def generate_interview_questions_async(role, skills, cache=None):
+    """
+    Async variant of generate_interview_questions built on model.ainvoke.
+    With a SemanticCache, near-identical skill sets for the same role reuse
+    a stored response.
+    """
+    partition = partition_key("interview_prep", role)
+    skills_text = ", ".join(skills)
+    if cache is not None:
+        cached = await cache.get(partition, skills_text)
+        if cached is not None:
+            return cached
+
+    response = await llm_client.ainvoke("interview_prep", interview_messages(role, skills))
+
+    if cache is not None and JsonArrayStream().feed(response):
+        await cache.set(partition, skills_text, response)
+    return response
+
+
+async def stream_interview_questions(role, skills, cache=None):
+    """Yields each question string as soon as it is complete in the LLM token stream."""
+    partition = partition_key("interview_prep", role)
+    skills_text = ", ".join(skills)
+    if cache is not None:
+        cached = await cache.get(partition, skills_text)
+        if cached is not None:
+            for question in JsonArrayStream().feed(cached):
+                yield question
+            return
+
+    parser = JsonArrayStream()
+    chunks = []
+    async for chunk in llm_client.astream("interview_prep", interview_messages(role, skills)):
+        chunks.append(chunk)
+        for question in parser.feed(chunk):
+            yield question
+        if parser.done:
+            break
+
+    if cache is not None and parser.done:
+        await cache.set(partition, skills_text, "".join(chunks))
 
 
 
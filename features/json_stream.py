@@ -0,0 +1,69 @@
+import json
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for the first JSON array in a stream of text chunks.
+
+    `feed(chunk)` returns every array element completed by that chunk, so
+    callers can forward items while the LLM is still generating the rest.
+    Text before the opening '[' (code fences, a wrapping object key) is
+    skipped, and anything after the closing ']' is ignored.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._current = []
+
+    def _flush(self, items):
+        text = "".join(self._current).strip()
+        self._current = []
+        if not text:
+            return
+        try:
+            items.append(json.loads(text))
+        except json.JSONDecodeError:
+            print(f"Skipping malformed streamed item: {text[:80]}")
+
+    def feed(self, chunk: str) -> list:
+        items = []
+
+        for ch in chunk:
+            if self.done:
+                break
+
+            if not self._started:
+                self._started = ch == "["
+                continue
+
+            if self._in_string:
+                self._current.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                if self._depth == 0:
+                    self._flush(items)
+                    self.done = True
+                    continue
+                self._depth -= 1
+            elif ch == "," and self._depth == 0:
+                self._flush(items)
+                continue
+
+            self._current.append(ch)
+
+        return items
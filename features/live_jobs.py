@@ -1,7 +1,11 @@
 import os
-import requests
+import time
+import asyncio
+import httpx
 from dotenv import load_dotenv
 
+from features.cache import create_cache, SingleFlight
+
 load_dotenv()
 
 SERPAPI_API_KEY = os.getenv("serpapi_api_key")
@@ -13,78 +17,155 @@ if not SERPAPI_API_KEY:
 if not JOOBLE_API_KEY:
     raise ValueError("Missing JOOBLE_API_KEY in environment")
 
+# Stop paging once this many unique jobs have been merged; each provider
+# gets an equal share of them.
+JOB_RESULTS_LIMIT = int(os.getenv("JOB_RESULTS_LIMIT", "20"))
+HTTP_TIMEOUT_SECONDS = 10.0
+
+job_cache = create_cache(
+    "job_search",
+    max_entries=int(os.getenv("JOB_CACHE_MAX_ENTRIES", "512")),
+    ttl_seconds=float(os.getenv("JOB_CACHE_TTL_SECONDS", "600")),
+)
+job_fetches = SingleFlight()
+
+_http_client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client, created on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
-def fetch_jobs_from_google(role_location: str) -> list:
-    """Fetch live job listings from Google Jobs via SerpApi."""
+
+def split_role_location(role_location: str):
     if "," in role_location:
         role, location = [x.strip() for x in role_location.split(",", 1)]
     else:
         role = role_location.strip()
         location = ""
+    return role, location
 
-    query = f"{role} jobs {location}" if location else f"{role} jobs"
 
-    params = {
-        "engine": "google_jobs",
-        "q": query,
-        "hl": "en",
-        "api_key": SERPAPI_API_KEY
-    }
+class JobProvider:
+    """
+    A job board. Subclasses implement `pages()` as an async generator that
+    yields one list of normalized job dicts per upstream page, so callers
+    only pay for the pages they actually consume.
+    """
 
-    response = requests.get("https://serpapi.com/search", params=params)
+    name = ""
+    timeout = 10.0
+    max_pages = 3
 
-    if response.status_code != 200:
-        return []
+    async def pages(self, client: httpx.AsyncClient, role: str, location: str):
+        raise NotImplementedError
+        yield
+
+
+JOB_PROVIDERS = {}
 
-    jobs = response.json().get("jobs_results", [])
 
-    return [
-        {
-            "title": job.get("title", "N/A"),
-            "company": job.get("company_name", "N/A"),
-            "location": job.get("location", "N/A"),
-            "link": job.get("apply_options", [{}])[0].get("link", "#")
+def register_provider(provider: JobProvider) -> JobProvider:
+    JOB_PROVIDERS[provider.name] = provider
+    return provider
+
+
+class GoogleJobsProvider(JobProvider):
+    """Live job listings from Google Jobs via SerpApi."""
+
+    name = "google"
+    timeout = float(os.getenv("SERPAPI_TIMEOUT_SECONDS", "10"))
+
+    async def pages(self, client, role, location):
+        query = f"{role} jobs {location}" if location else f"{role} jobs"
+
+        params = {
+            "engine": "google_jobs",
+            "q": query,
+            "hl": "en",
+            "api_key": SERPAPI_API_KEY
         }
-        for job in jobs[:10]
-    ]
 
+        for _ in range(self.max_pages):
+            response = await client.get("https://serpapi.com/search", params=params)
+            response.raise_for_status()
 
-def fetch_jobs_from_jooble(role_location: str) -> list:
-    """Search for job vacancies on Jooble."""
-    if "," in role_location:
-        role, location = [x.strip() for x in role_location.split(",", 1)]
-    else:
-        role = role_location.strip()
-        location = "India"
+            data = response.json()
+            jobs = data.get("jobs_results", [])
+            if not jobs:
+                return
 
-    url = f"https://jooble.org/api/{JOOBLE_API_KEY}"
-    headers = {"Content-Type": "application/json"}
-    payload = {"keywords": role, "location": location, "page": 1}
+            yield [
+                {
+                    "title": job.get("title", "N/A"),
+                    "company": job.get("company_name", "N/A"),
+                    "location": job.get("location", "N/A"),
+                    "link": job.get("apply_options", [{}])[0].get("link", "#")
+                }
+                for job in jobs
+            ]
 
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
+            next_page_token = data.get("serpapi_pagination", {}).get("next_page_token")
+            if not next_page_token:
+                return
+            params["next_page_token"] = next_page_token
 
-        jobs = response.json().get("jobs", [])
 
-        return [
-            {
-                "title": job.get("title", "N/A"),
-                "company": job.get("company", "N/A"),
-                "location": job.get("location", "N/A"),
-                "link": job.get("link", "#")
-            }
-            for job in jobs[:10]
-        ]
+class JoobleProvider(JobProvider):
+    """Job vacancies from Jooble."""
 
-    except Exception as e:
-        print(f"❌ Jooble error: {e}")
-        return []
+    name = "jooble"
+    timeout = float(os.getenv("JOOBLE_TIMEOUT_SECONDS", "8"))
 
+    async def pages(self, client, role, location):
+        url = f"https://jooble.org/api/{JOOBLE_API_KEY}"
+        headers = {"Content-Type": "application/json"}
 
-def dedupe_jobs(jobs: list) -> list:
-    """Remove duplicate jobs based on title, company, and location."""
-    seen = set()
+        for page in range(1, self.max_pages + 1):
+            payload = {"keywords": role, "location": location or "India", "page": page}
+
+            response = await client.post(url, json=payload, headers=headers)
+            response.raise_for_status()
+
+            jobs = response.json().get("jobs", [])
+            if not jobs:
+                return
+
+            yield [
+                {
+                    "title": job.get("title", "N/A"),
+                    "company": job.get("company", "N/A"),
+                    "location": job.get("location", "N/A"),
+                    "link": job.get("link", "#")
+                }
+                for job in jobs
+            ]
+
+
+register_provider(JoobleProvider())
+register_provider(GoogleJobsProvider())
+
+
+def dedupe_jobs(jobs: list, seen: set = None) -> list:
+    """
+    Remove duplicate jobs based on title, company, and location.
+    Pass a shared `seen` set to dedupe incrementally across batches.
+    """
+    if seen is None:
+        seen = set()
     unique = []
 
     for job in jobs:
@@ -96,26 +177,133 @@ def dedupe_jobs(jobs: list) -> list:
     return unique
 
 
-def fetch_jobs_smart(role_location: str) -> list:
-    """Fetch jobs from both sources and remove duplicates."""
-    combined_jobs = []
+def describe_error(e: Exception) -> str:
+    # Status errors carry the request URL, which embeds the Jooble API key.
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"HTTP {e.response.status_code}"
+    if isinstance(e, asyncio.TimeoutError):
+        return "Timed out"
+    return f"{type(e).__name__}: {e}"
 
-    print("🔎 Fetching from Jooble...")
-    combined_jobs.extend(fetch_jobs_from_jooble(role_location))
 
-    print("🔎 Fetching from Google Jobs...")
-    combined_jobs.extend(fetch_jobs_from_google(role_location))
+async def stream_provider(provider: JobProvider, client, role, location, queue, sources):
+    """
+    Pushes each page from one provider onto the merge queue as
+    (provider name, page) under the provider's deadline, then a
+    (provider name, None) end marker. The bounded queue keeps the generator
+    from fetching pages the merger has not asked for yet.
+    """
+    start = time.perf_counter()
+    metadata = {"latency_ms": 0.0, "count": 0, "pages": 0, "error": None, "stopped_early": False}
 
-    return dedupe_jobs(combined_jobs)
+    try:
+        async with asyncio.timeout(provider.timeout):
+            async for page in provider.pages(client, role, location):
+                metadata["pages"] += 1
+                metadata["count"] += len(page)
+                await queue.put((provider.name, page))
+    except asyncio.CancelledError:
+        metadata["stopped_early"] = True
+        raise
+    except Exception as e:
+        metadata["error"] = describe_error(e)
+        print(f"❌ {provider.name} error: {metadata['error']}")
+    finally:
+        metadata["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        sources[provider.name] = metadata
 
+    await queue.put((provider.name, None))
 
-def run_job_agent(query: str) -> list:
+
+async def fetch_jobs_smart(role_location: str, client: httpx.AsyncClient = None, limit: int = None) -> dict:
+    """
+    Query all registered providers concurrently and merge their pages as
+    they arrive, deduplicating across providers. Each provider fills an
+    equal share of the `limit` slots, so the fastest one cannot crowd out
+    the others, and stops paging once its share is full; its surplus jobs
+    only fill slots another provider left empty.
+    """
+    client = client or get_http_client()
+    limit = limit or JOB_RESULTS_LIMIT
+    role, location = split_role_location(role_location)
+
+    share = -(-limit // len(JOB_PROVIDERS))
+    queue = asyncio.Queue(maxsize=len(JOB_PROVIDERS))
+    sources = {}
+    tasks = {
+        name: asyncio.create_task(stream_provider(provider, client, role, location, queue, sources))
+        for name, provider in JOB_PROVIDERS.items()
+    }
+
+    seen = set()
+    taken = {name: [] for name in tasks}
+    surplus = {name: [] for name in tasks}
+    active = set(tasks)
+    try:
+        while active:
+            name, page = await queue.get()
+            if page is None:
+                active.discard(name)
+                continue
+            for job in dedupe_jobs(page, seen):
+                (taken[name] if len(taken[name]) < share else surplus[name]).append(job)
+            if name in active and len(taken[name]) >= share:
+                tasks[name].cancel()
+                active.discard(name)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    jobs = [job for name in tasks for job in taken[name]]
+    jobs += [job for name in tasks for job in surplus[name]]
+    return {"jobs": jobs[:limit], "sources": sources}
+
+
+def normalize_job_query(role_location: str) -> str:
+    """Cache key for a "role, location" query: case- and whitespace-insensitive."""
+    parts = role_location.split(",", 1)
+    return "|".join(" ".join(part.lower().split()) for part in parts)
+
+
+async def fetch_jobs_cached(role_location: str) -> dict:
+    key = normalize_job_query(role_location)
+
+    cached = await job_cache.get(key)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    async def fetch_and_store():
+        result = await fetch_jobs_smart(role_location)
+        # Only complete answers are cached; a failed source should be retried.
+        if not any(meta["error"] for meta in result["sources"].values()):
+            await job_cache.set(key, result)
+        return result
+
+    result = await job_fetches.do(key, fetch_and_store)
+    return {**result, "cached": False}
+
+
+async def run_job_agent_async(query: str) -> dict:
     """
     FastAPI-safe wrapper.
-    Always returns list[dict].
+    Always returns {"jobs": list[dict], "sources": dict, "cached": bool}.
     """
     try:
-        return fetch_jobs_smart(query)
+        return await fetch_jobs_cached(query)
+    except Exception as e:
+        print(f"❌ Job fetch failed: {e}")
+        return {"jobs": [], "sources": {}, "cached": False}
+
+
+def run_job_agent(query: str) -> list:
+    """Blocking wrapper for scripts; uses its own short-lived client."""
+    async def _run():
+        async with httpx.AsyncClient(timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS)) as client:
+            return await fetch_jobs_smart(query, client)
+
+    try:
+        return asyncio.run(_run())["jobs"]
     except Exception as e:
         print(f"❌ Job fetch failed: {e}")
         return []
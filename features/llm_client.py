@@ -0,0 +1,192 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+from features.llm_governor import LLMGovernor
+
+
+load_dotenv()
+
+
+DEFAULT_PROVIDER = "google_genai"
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Cheap stages can be routed to a faster model tier by setting
+# LLM_MODEL_<TIER> (e.g. LLM_MODEL_FAST=gemini-2.5-flash-lite); unset, they
+# use the regular model.
+FEATURE_TIERS = {"extraction": "fast"}
+
+# Per-attempt deadline in seconds; LLM_TIMEOUT_<FEATURE> overrides it.
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+# Features whose calls are duplicated once they outlive the model's p95 latency.
+HEDGED_FEATURES = set(filter(None, os.getenv("LLM_HEDGE_FEATURES", "").split(",")))
+
+# Canned replies for the offline "fake" provider, in call order per feature.
+FAKE_RESPONSES = {
+    "extraction": [
+        '{"sections": {"contact": "", "summary": "", "experience": "", "projects": "", '
+        '"education": "", "skills": "Python, SQL", "certifications": ""}, "skills": ["Python", "SQL"]}',
+    ],
+    "missing_skills": [
+        '{"Core Technical Skills": [], "Programming Languages/Frameworks": [], "Tools & Platforms": []}',
+    ],
+    "interview_prep": [
+        '{"questions": ["Tell me about yourself."]}',
+    ],
+    "project_ideas": [
+        '[{"title": "Sample Project", "objective": "", "tools": "", "skills": ""}]',
+    ],
+}
+
+_clients = {}
+_governors = {}
+_lock = threading.Lock()
+
+
+def _tier_model(feature: str):
+    tier = FEATURE_TIERS.get(feature)
+    return os.getenv(f"LLM_MODEL_{tier.upper()}") if tier else None
+
+
+def model_config(feature: str):
+    """
+    Resolves (provider, model) for a feature. LLM_PROVIDER_<FEATURE> and
+    LLM_MODEL_<FEATURE> override the feature's tier model (see
+    FEATURE_TIERS), which overrides the global LLM_PROVIDER / LLM_MODEL.
+    """
+    suffix = feature.upper()
+    provider = os.getenv(f"LLM_PROVIDER_{suffix}") or os.getenv("LLM_PROVIDER", DEFAULT_PROVIDER)
+    model = (
+        os.getenv(f"LLM_MODEL_{suffix}")
+        or _tier_model(feature)
+        or os.getenv("LLM_MODEL", DEFAULT_MODEL)
+    )
+    return provider, model
+
+
+def call_timeout(feature: str) -> float:
+    return float(os.getenv(f"LLM_TIMEOUT_{feature.upper()}", DEFAULT_TIMEOUT_SECONDS))
+
+
+def _client_timeout() -> float:
+    # Clients are shared across features, so the HTTP timeout is only a
+    # backstop at the longest configured deadline; the governor enforces
+    # each feature's own.
+    overrides = [float(v) for k, v in os.environ.items() if k.startswith("LLM_TIMEOUT_")]
+    return max([DEFAULT_TIMEOUT_SECONDS] + overrides)
+
+
+def model_name(feature: str) -> str:
+    provider, model = model_config(feature)
+    return f"{provider}:{model}"
+
+
+def _build_client(provider: str, model: str, feature: str):
+    if provider == "fake":
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+        return FakeListChatModel(responses=FAKE_RESPONSES.get(feature, ["{}"]))
+
+    if provider == "google_genai" and os.getenv("gemini_api_key"):
+        os.environ.setdefault("GEMINI_API_KEY", os.getenv("gemini_api_key"))
+
+    from langchain.chat_models import init_chat_model
+    # Retries belong to the governor; SDK retries would multiply its attempts
+    # and hide failures from the circuit breaker.
+    return init_chat_model(f"{provider}:{model}", max_retries=0, timeout=_client_timeout())
+
+
+def _client_key(feature: str):
+    provider, model = model_config(feature)
+    # Fake clients replay per-feature scripts, so they are never shared.
+    return (provider, feature if provider == "fake" else model)
+
+
+def get_chat_model(feature: str):
+    """
+    Returns the chat model for a feature, creating it on first use. Features
+    resolving to the same provider and model share one client, and with it
+    one HTTP connection pool.
+    """
+    key = _client_key(feature)
+
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _build_client(*model_config(feature), feature)
+                _clients[key] = client
+    return client
+
+
+def get_governor(feature: str) -> LLMGovernor:
+    """Rate limiter, retry policy and circuit breaker shared by every feature using the same model."""
+    key = _client_key(feature)
+
+    governor = _governors.get(key)
+    if governor is None:
+        with _lock:
+            governor = _governors.get(key)
+            if governor is None:
+                governor = LLMGovernor(":".join(key))
+                _governors[key] = governor
+    return governor
+
+
+def governor_stats() -> dict:
+    return {governor.name: governor.stats() for governor in list(_governors.values())}
+
+
+def invoke(feature: str, messages) -> str:
+    model = get_chat_model(feature)
+    return get_governor(feature).call(lambda: model.invoke(messages), messages).content
+
+
+async def _acall(feature: str, fn, messages):
+    return await get_governor(feature).acall(
+        fn, messages, timeout=call_timeout(feature), hedge=feature in HEDGED_FEATURES
+    )
+
+
+async def ainvoke(feature: str, messages) -> str:
+    model = get_chat_model(feature)
+    response = await _acall(feature, lambda: model.ainvoke(messages), messages)
+    return response.content
+
+
+def _chunk_text(chunk) -> str:
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    # Some providers stream a list of content parts.
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+async def astream(feature: str, messages):
+    """Yields the model's reply as text chunks while it is being generated."""
+    model = get_chat_model(feature)
+    stream = get_governor(feature).astream(lambda: model.astream(messages), messages, timeout=call_timeout(feature))
+    async for chunk in stream:
+        text = _chunk_text(chunk)
+        if text:
+            yield text
+
+
+def _json_object(text: str) -> str:
+    start, end = text.find("{"), text.rfind("}")
+    return text[start:end + 1] if start != -1 and end != -1 else text
+
+
+async def astructured(feature: str, messages, schema):
+    """
+    Reply validated into the Pydantic `schema`. Uses the provider's native
+    structured output where available; models without it (e.g. the fake
+    provider) are parsed from the JSON object in their text reply.
+    """
+    model = get_chat_model(feature)
+    try:
+        structured = model.with_structured_output(schema)
+    except NotImplementedError:
+        response = await _acall(feature, lambda: model.ainvoke(messages), messages)
+        return schema.model_validate_json(_json_object(response.content))
+    return await _acall(feature, lambda: structured.ainvoke(messages), messages)
@@ -0,0 +1,392 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import weakref
+from collections import deque
+
+
+# In-flight calls per worker, across all models.
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Buckets are per process, so each of the LLM_WORKERS server workers
+# enforces an equal share of the quota.
+WORKERS = max(1, int(os.getenv("LLM_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1"))
+# Quota per model across all workers; 0 disables the corresponding bucket.
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")) / WORKERS
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "250000")) / WORKERS
+# Reply tokens reserved up front, before the real usage is known.
+OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "1000"))
+
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "20"))
+
+# Hedged calls fire a duplicate once a call outlives this latency percentile,
+# measured over the last LATENCY_WINDOW successful calls of the model.
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LATENCY_WINDOW = 200
+
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "RateLimitError", "APITimeoutError", "APIConnectionError", "ServerError",
+}
+
+
+class LLMUnavailable(Exception):
+    """The provider is over quota or failing; callers should answer 503 and retry later."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Quota, overload, timeout and connection errors, judged along the exception chain."""
+    while error is not None:
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+            return True
+        for attr in ("status_code", "code", "status"):
+            if getattr(error, attr, None) in RETRYABLE_STATUS_CODES:
+                return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size (4 characters per token) plus the expected reply."""
+    chars = sum(len(str(getattr(m, "content", m))) for m in messages)
+    return chars // 4 + OUTPUT_TOKEN_ESTIMATE
+
+
+class TokenBucket:
+    """
+    Per-minute quota refilled continuously. `reserve` takes the amount,
+    going into debt if needed, and returns how long the caller must wait;
+    concurrent callers therefore queue in arrival order. With `max_wait`,
+    a reservation that would wait longer is not taken and its wait is
+    returned as a negative number.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float, max_wait: float = None) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            amount = min(amount, self.capacity)
+            wait = max(0.0, (amount - self.level) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                return -wait
+            self.level -= amount
+            return wait
+
+    def refund(self, amount: float):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies (seconds)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = HEDGE_MIN_SAMPLES):
+        """The q-th percentile, or None until `min_samples` calls were seen."""
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures and
+    rejects calls until `cooldown_seconds` have passed. It is then
+    half-open: a single trial call is let through, which either closes it
+    or re-opens it, and other calls are rejected until it resolves. A trial
+    that never reports back (e.g. cancelled) expires after another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started = None
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """Seconds until the cooldown ends (0 when closed or half-open)."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown_seconds - time.monotonic())
+
+    def admit(self) -> float:
+        """0 when a call may go ahead (possibly as the trial), else seconds to wait."""
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            now = time.monotonic()
+            remaining = self.opened_at + self.cooldown_seconds - now
+            if remaining > 0:
+                return remaining
+            if self.trial_started is not None and now - self.trial_started < self.cooldown_seconds:
+                return self.trial_started + self.cooldown_seconds - now
+            self.trial_started = now
+            return 0.0
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_started is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.trial_started = None
+
+
+# The concurrency cap is shared by every governor in the process.
+_thread_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+# asyncio primitives belong to one event loop.
+_loop_slots = weakref.WeakKeyDictionary()
+
+
+def _async_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _loop_slots.get(loop)
+    if slots is None:
+        slots = _loop_slots[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return slots
+
+
+class LLMGovernor:
+    """
+    Admission control for one model: request and token per-minute buckets
+    (under the process-wide concurrency cap), jittered exponential retries
+    on retryable errors and a circuit breaker that fails fast while the
+    provider is down.
+    """
+
+    def __init__(self, name: str,
+                 requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_retries: int = MAX_RETRIES):
+        self.name = name
+        self.max_retries = max_retries
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.breaker = CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS)
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.retries = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.hedges = 0
+
+    def _admit(self, messages, max_wait: float = None):
+        """
+        Checks the breaker and reserves quota; returns (wait_seconds,
+        reserved_tokens). Raises LLMUnavailable instead of queueing for
+        longer than `max_wait` seconds.
+        """
+        remaining = self.breaker.admit()
+        if remaining > 0:
+            self.rejected += 1
+            raise LLMUnavailable(f"{self.name} is unavailable (circuit open)", retry_after=remaining)
+
+        reserved = estimate_tokens(messages)
+        request_wait = self.requests.reserve(1, max_wait)
+        token_wait = self.tokens.reserve(reserved, max_wait) if request_wait >= 0 else 0.0
+        if request_wait < 0 or token_wait < 0:
+            if request_wait >= 0:
+                self.requests.refund(1)
+            self.rejected += 1
+            wait = max(abs(request_wait), abs(token_wait))
+            raise LLMUnavailable(f"{self.name} is over quota", retry_after=wait)
+        return max(request_wait, token_wait), reserved
+
+    def _settle(self, response, reserved: int):
+        """Returns unused token reservation once the real usage is known."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        total = usage.get("total_tokens") if isinstance(usage, dict) else None
+        if total is not None:
+            self.tokens.refund(reserved - total)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+    def _failed(self, error: Exception):
+        """Re-raises non-retryable errors; counts retryable ones against the breaker."""
+        if not is_retryable(error):
+            raise error
+        self.breaker.record_failure()
+
+    def _exhausted(self, error: Exception):
+        return LLMUnavailable(
+            f"{self.name} failed after {self.max_retries + 1} attempts: {str(error) or type(error).__name__}",
+            retry_after=self.breaker.remaining() or None,
+        )
+
+    def call(self, fn, messages):
+        """Runs a blocking model call `fn()` under the governor."""
+        for attempt in range(self.max_retries + 1):
+            wait, reserved = self._admit(messages)
+            time.sleep(wait)
+            with _thread_slots:
+                self.calls += 1
+                try:
+                    response = fn()
+                except Exception as e:
+                    self._failed(e)
+                    error = e
+                else:
+                    self.breaker.record_success()
+                    self._settle(response, reserved)
+                    return response
+            if attempt < self.max_retries:
+                self.retries += 1
+                time.sleep(self._backoff(attempt))
+        raise self._exhausted(error) from error
+
+    def _hedge_allowed(self, messages) -> bool:
+        """A hedge is only fired when it fits in the quota right now; it never waits."""
+        if self.requests.reserve(1, max_wait=0) < 0:
+            return False
+        self.tokens.reserve(estimate_tokens(messages))
+        return True
+
+    async def _hedged(self, fn, messages):
+        """
+        Runs `fn()`; if it is still pending at the model's p95 latency, fires
+        a duplicate and returns whichever succeeds first.
+        """
+        delay = self.latency.percentile(HEDGE_PERCENTILE)
+        primary = asyncio.ensure_future(fn())
+        tasks = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._hedge_allowed(messages):
+                    self.hedges += 1
+                    tasks.add(asyncio.ensure_future(fn()))
+
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def acall(self, fn, messages, timeout: float = None, hedge: bool = False):
+        """
+        Awaits a model call `fn()` under the governor. Each attempt is
+        bounded by `timeout` seconds (timeouts are retried like other
+        transient errors) and, with `hedge`, duplicated at the p95 mark.
+        A call whose quota wait would exceed `timeout` is rejected.
+        """
+        for attempt in range(self.max_retries + 1):
+            wait, reserved = self._admit(messages, max_wait=timeout)
+            await asyncio.sleep(wait)
+            async with _async_slots():
+                self.calls += 1
+                start = time.monotonic()
+                try:
+                    call = self._hedged(fn, messages) if hedge else fn()
+                    response = await asyncio.wait_for(call, timeout)
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.timeouts += 1
+                    self._failed(e)
+                    error = e
+                else:
+                    self.latency.record(time.monotonic() - start)
+                    self.breaker.record_success()
+                    self._settle(response, reserved)
+                    return response
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+        raise self._exhausted(error) from error
+
+    async def astream(self, fn, messages, timeout: float = None):
+        """
+        Relays the chunks of a streaming model call `fn()`. `timeout` bounds
+        the wait for the first chunk. Failures are only retried before the
+        first chunk; after that the error is raised.
+        """
+        for attempt in range(self.max_retries + 1):
+            wait, _ = self._admit(messages, max_wait=timeout)
+            await asyncio.sleep(wait)
+            async with _async_slots():
+                self.calls += 1
+                started = False
+                stream = fn()
+                try:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout)
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise
+                    started = True
+                    yield chunk
+                    async for chunk in stream:
+                        yield chunk
+                except StopAsyncIteration:
+                    self.breaker.record_success()
+                    return
+                except Exception as e:
+                    if started:
+                        if is_retryable(e):
+                            self.breaker.record_failure()
+                        raise
+                    self._failed(e)
+                    error = e
+                else:
+                    self.breaker.record_success()
+                    return
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+        raise self._exhausted(error) from error
+
+    def stats(self) -> dict:
+        p95 = self.latency.percentile(95, min_samples=1)
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "circuit_open": self.breaker.opened_at is not None,
+        }
@@ -1,21 +1,87 @@
-import io
-from PyPDF2 import PdfReader
-import docx
 import os
 from dotenv import load_dotenv
 import re
-from langchain.chat_models import init_chat_model
+import json
+from typing import List
+from pydantic import BaseModel, Field
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from features.cache import create_cache, make_cache_key
+from features.document_parser import extract_text_from_bytes
+from features.resume_compaction import compact_resume_text, truncate_to_budget
+from features.resume_sections import SECTION_NAMES, split_sections_json
+from features.skill_extractor import extract_resume_locally
+from features.role_index import subtract_skills
+from features import llm_client
+
 
 load_dotenv()
 
 
 
-os.environ["GEMINI_API_KEY"] = os.getenv("gemini_api_key")
+SKILLS_PROMPT = """
+Extract all skills mentioned in the resume.
+
+Return ONLY valid JSON in this format:
+
+{{"skills": ["Python", "Machine Learning", "SQL", "TensorFlow"]}}
+
+Resume:
+{text}
+"""
+
+EXTRACTION_PROMPT = """
+You are an AI that organizes resume text into structured sections and extracts the candidate's skills.
+
+Task:
+- Copy the resume text into these sections: contact (name and contact information),
+  summary (introduction/summary), experience, projects, education, skills, certifications.
+- If a section uses a different title (e.g., "Profile", "Career Overview"), map it to the most relevant one.
+- If any section is missing, use an empty string ("").
+- List every skill mentioned anywhere in the resume in "skills", e.g. ["Python", "Machine Learning", "SQL"].
 
-model = init_chat_model("google_genai:gemini-2.5-flash")
+Input Resume Text:
+{text}
 
+Output:
+Return ONLY valid JSON in this format:
+{{
+  "sections": {{
+    "contact": "", "summary": "", "experience": "", "projects": "",
+    "education": "", "skills": "", "certifications": ""
+  }},
+  "skills": []
+}}
+"""
+
+
+class ResumeSections(BaseModel):
+    contact: str = Field("", description="Name and Contact Information")
+    summary: str = Field("", description="Introduction/Summary")
+    experience: str = ""
+    projects: str = ""
+    education: str = ""
+    skills: str = ""
+    certifications: str = ""
+
+
+class ResumeSkills(BaseModel):
+    skills: List[str] = Field(default_factory=list, description="Every skill mentioned in the resume")
+
+
+class ResumeExtraction(ResumeSkills):
+    """Sections and skills of a resume, returned by one structured-output call."""
+    sections: ResumeSections
+
+
+# ResumeSections fields in the order of SECTION_NAMES.
+_SECTION_FIELDS = dict(zip(SECTION_NAMES, ResumeSections.model_fields))
+
+extraction_cache = create_cache(
+    "resume_extraction",
+    max_entries=int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", "86400")),
+)
 
 def extract_json(text):
     if not text:
@@ -39,18 +105,16 @@ def extract_text_from_file(file_source):
     - File path (str)
     """
 
-    text = ""
-
     # --- Case 1: FastAPI UploadFile ---
     if hasattr(file_source, "file") and hasattr(file_source, "filename"):
         filename = file_source.filename
-        content_stream = io.BytesIO(file_source.file.read())
+        content = file_source.file.read()
         file_source.file.seek(0)
 
     # --- Case 2: File-like object ---
     elif hasattr(file_source, "read"):
         filename = getattr(file_source, "filename", "")
-        content_stream = io.BytesIO(file_source.read())
+        content = file_source.read()
         file_source.seek(0)
 
     # --- Case 3: File path ---
@@ -58,136 +122,102 @@ def extract_text_from_file(file_source):
         if not os.path.exists(file_source):
             raise FileNotFoundError(f"No such file: '{file_source}'")
         filename = file_source
-        content_stream = file_source
+        with open(file_source, "rb") as f:
+            content = f.read()
 
     else:
         raise TypeError("Invalid file source provided.")
 
-    # --- Handle PDF ---
-    if filename.lower().endswith(".pdf"):
-        reader = PdfReader(content_stream)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-
-    # --- Handle DOCX ---
-    elif filename.lower().endswith(".docx"):
-        document = docx.Document(content_stream)
-        for para in document.paragraphs:
-            text += para.text + "\n"
-
-    else:
-        raise ValueError("Unsupported file type. Please upload PDF or DOCX.")
-
+    text, _ = compact_resume_text(extract_text_from_bytes(filename, content))
     return text
 
 
 
-def send_text_to_llm(text):
-    
-    prompt = f"""
-    You are an AI that organizes resume text into structured sections.
-
-    Task:
-    - Organize the resume text into these exact sections:
-      - Name and Contact Information
-      - Introduction/Summary
-      - Experience
-      - Projects
-      - Education
-      - Skills
-      - Certifications
-    - If a section uses a different title (e.g., "Profile", "Career Overview"), map it to the most relevant one.
-    - If any section is missing, still include it with an empty string ("").
-
-    Input Resume Text:
-    {text}
-
-    Output:
-    Return ONLY valid JSON in this format:
-    {{
-      "Name and Contact Information": "",
-      "Introduction/Summary": "",
-      "Experience": "",
-      "Projects": "",
-      "Education": "",
-      "Skills": "",
-      "Certifications": ""
-    }}
+async def invoke_model_async(feature, messages):
     """
+    Calls the feature's model through the LLM governor. Quota and provider
+    outages raise LLMUnavailable, which routes answer with 503.
+    """
+    return await llm_client.ainvoke(feature, messages)
 
 
-    # try:
-    #     response = client.chat_completion(model="meta-llama/Llama-3.3-70B-Instruct", messages=[
-    #         {"role": "system", "content": "You are a helpful assistant."},
-    #         {"role": "user", "content": prompt}
-    #     ])
-
-    #     return f"{response.choices[0].message.content}"
-
-
-    # except Exception as e:
-    #     return f"⚠️ Error generating response: {str(e)}"
+def skills_messages(text):
+    prompt = SKILLS_PROMPT.format(text=text)
+    return [HumanMessage(content=prompt)]
 
-    try:
-        response = model.invoke([
-            SystemMessage(content="You are a helpful assistant."),
-            HumanMessage(content=prompt)
-        ])
 
-        return response.content
+def extraction_messages(text):
+    return [
+        SystemMessage(content="You are a helpful assistant."),
+        HumanMessage(content=EXTRACTION_PROMPT.format(text=text))
+    ]
 
-    except Exception as e:
-        return f"⚠️ Error generating response: {str(e)}"
-    
 
-def retrieve_skills(text):
-    prompt = f"""
-Extract all skills mentioned in the resume.
+async def extract_resume_llm(resume_text):
+    """
+    Sections JSON (keyed by SECTION_NAMES) and skill list in one
+    schema-constrained LLM call.
+    """
+    extraction = await llm_client.astructured("extraction", extraction_messages(resume_text), ResumeExtraction)
+    structured_text = json.dumps({
+        name: getattr(extraction.sections, field) for name, field in _SECTION_FIELDS.items()
+    })
+    return structured_text, extraction.skills
 
-Return ONLY valid JSON array format like this:
 
-["Python", "Machine Learning", "SQL", "TensorFlow"]
+def normalize_resume_text(text):
+    return " ".join(text.split())
 
-Resume:
-{text}
-"""
 
-    try:
-        response = model.invoke([
-            HumanMessage(content=prompt)
-        ])
+async def extract_resume_skills(resume_text, sections=None):
+    """
+    Returns (structured_text, skill_list) for a resume. Typical resumes are
+    handled by the local heading + skill gazetteer extractor; the LLM is the
+    fallback when that result is low confidence, and then makes a single
+    call: skills only when the headings were split locally, otherwise the
+    fused sections + skills extraction. LLM results are cached by a hash of
+    the normalized text, the prompts and the model name, so a repeat
+    analysis of the same resume makes no extraction calls; LLM errors are
+    raised and never cached.
+    """
+    local = extract_resume_locally(resume_text, sections)
+    if local is not None:
+        return local
+
+    key = make_cache_key(
+        normalize_resume_text(resume_text), EXTRACTION_PROMPT, SKILLS_PROMPT,
+        llm_client.model_name("extraction")
+    )
+
+    cached = await extraction_cache.get(key)
+    if cached is not None:
+        return cached["structured_text"], cached["skills"]
+
+    structured_text = split_sections_json(resume_text, sections)
+    # Uploads are already compacted; this catches pasted resume_text. Only
+    # the prompt is cut to the token budget.
+    prompt_text = truncate_to_budget(compact_resume_text(resume_text)[0])
+    if structured_text is None:
+        structured_text, skill_list = await extract_resume_llm(prompt_text)
+    else:
+        skill_list = (await llm_client.astructured("extraction", skills_messages(prompt_text), ResumeSkills)).skills
 
-        return response.content
+    print(f"Extracted Skills: {skill_list}")
 
-    except Exception as e:
-        return f"⚠️ Error generating response: {str(e)}"
+    await extraction_cache.set(key, {"structured_text": structured_text, "skills": skill_list})
+    return structured_text, skill_list
 
-    
-    
 
-def generate_missing_skills(role, candidate_skills):
+def role_requirements_messages(role):
 
     prompt = f"""
-You are an industry recruiter evaluating a CANDIDATE for an ENTRY-LEVEL {role} position.
+You are an industry recruiter defining the requirements for an ENTRY-LEVEL {role} position.
 
 Important Rules:
-- Only consider ESSENTIAL skills required for an medium-level role.
+- Only list ESSENTIAL skills required for the role.
 - Do NOT include advanced, research-level, or senior-level skills.
-- Do NOT suggest optional or nice-to-have tools.
-- If the candidate already has strong ML fundamentals, do NOT suggest redundant skills.
+- Do NOT include optional or nice-to-have tools.
 - Be realistic and conservative.
-- If candidate already meets core requirements, return empty lists.
-
-Candidate Skills:
-{candidate_skills}
-
-Your Task:
-1. Identify ONLY fundamental skills truly required for entry-level {role}.
-2. Compare carefully with candidate skills.
-3. Return ONLY missing ESSENTIAL skills.
-4. If nothing essential is missing, return empty arrays.
 
 Return STRICT JSON in this format:
 
@@ -199,14 +229,32 @@ Return STRICT JSON in this format:
 
 Return ONLY JSON.
 """
-    try:
-        response = model.invoke([
-            HumanMessage(content=prompt)
-        ])
-        return response.content
+    return [HumanMessage(content=prompt)]
 
-    except Exception as e:
-        return f"⚠️ Error generating response: {str(e)}"
+
+async def find_missing_skills(role, candidate_skills, role_index):
+    """
+    Missing essential skills per category. Role requirements come from the
+    role index (exact or fuzzy title match); only unseen roles ask the LLM,
+    and the answer is stored for next time. The comparison itself is a
+    local set difference.
+    """
+    requirements = await role_index.lookup(role)
+
+    if requirements is None:
+        response = await invoke_model_async("missing_skills", role_requirements_messages(role))
+        print(f"LLM Role Requirements Response: {response}")
+
+        try:
+            requirements = json.loads(extract_json(response))
+        except json.JSONDecodeError:
+            raise ValueError("LLM returned invalid JSON for role requirements")
+        if not isinstance(requirements, dict):
+            raise ValueError("LLM returned invalid JSON for role requirements")
+
+        await role_index.add(role, requirements)
+
+    return subtract_skills(requirements, candidate_skills)
 
 
 
@@ -215,11 +263,6 @@ Return ONLY JSON.
 # text = extract_text_from_file("Resume.pdf")
 # print(text)
 
-# structured_text = send_text_to_llm(text)
+# structured_text, skills = asyncio.run(extract_resume_skills(text))
 # print(structured_text)
-
-# skills = retrieve_skills(structured_text)
 # print(skills)
-
-# missing_skills = generate_missing_skills("Machine Learning engineer", skills)
-# print(missing_skills)
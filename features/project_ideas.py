@@ -1,17 +1,12 @@
 import json
-import os
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import SystemMessage, HumanMessage
 
+from features import llm_client
+from features.json_stream import JsonArrayStream
+from features.semantic_cache import partition_key
 
 
-
-os.environ["GEMINI_API_KEY"] = os.getenv("gemini_api_key")
-
-model = init_chat_model("google_genai:gemini-2.5-flash")
-
-
-def generate_project_ideas(role, job_description):
+def project_messages(role, job_description):
     # """Generates structured project ideas and returns a list of dicts."""
     prompt = f"""
     Act as an expert AI career mentor. Based on the job role "{role}" and the following job description:
@@ -38,33 +33,76 @@ def generate_project_ideas(role, job_description):
     ]
     """
 
-    try:
-        response = model.invoke([
-            SystemMessage(content="You are a helpful assistant."),
-            HumanMessage(content=prompt)
-        ])
+    return [
+        SystemMessage(content="You are a helpful assistant."),
+        HumanMessage(content=prompt)
+    ]
 
-        raw_output_from_llm = response.content
 
-        
-        json_start_index = raw_output_from_llm.find('[')
-        
-        json_end_index = raw_output_from_llm.rfind(']')
-        
-        if json_start_index == -1 or json_end_index == -1:
-            print("Error: Valid JSON array not found in the LLM response.")
-            return [] 
+def parse_project_ideas(raw_output_from_llm):
+    json_start_index = raw_output_from_llm.find('[')
+    
+    json_end_index = raw_output_from_llm.rfind(']')
+    
+    if json_start_index == -1 or json_end_index == -1:
+        print("Error: Valid JSON array not found in the LLM response.")
+        return [] 
 
-        json_string = raw_output_from_llm[json_start_index : json_end_index + 1]
-        
-        parsed_projects = json.loads(json_string)
+    json_string = raw_output_from_llm[json_start_index : json_end_index + 1]
+    
+    parsed_projects = json.loads(json_string)
 
-        # return f"{response['message']['content']}"
-        return parsed_projects
+    # return f"{response['message']['content']}"
+    return parsed_projects
 
 
-    except Exception as e:
-        return f"⚠️ Error generating response: {str(e)}"
+def generate_project_ideas(role, job_description):
+    """Generates structured project ideas and returns a list of dicts."""
+    raw_output_from_llm = llm_client.invoke("project_ideas", project_messages(role, job_description))
+    return parse_project_ideas(raw_output_from_llm)
+
+
+async def generate_project_ideas_async(role, job_description, cache=None):
+    """
+    Async variant of generate_project_ideas built on model.ainvoke. With a
+    SemanticCache, near-identical job descriptions for the same role reuse
+    a stored answer.
+    """
+    partition = partition_key("project_ideas", role)
+    if cache is not None:
+        cached = await cache.get(partition, job_description)
+        if cached is not None:
+            return cached
+
+    raw_output_from_llm = await llm_client.ainvoke("project_ideas", project_messages(role, job_description))
+    projects = parse_project_ideas(raw_output_from_llm)
+
+    if cache is not None and projects:
+        await cache.set(partition, job_description, projects)
+    return projects
+
+
+async def stream_project_ideas(role, job_description, cache=None):
+    """Yields each project idea dict as soon as it is complete in the LLM token stream."""
+    partition = partition_key("project_ideas", role)
+    if cache is not None:
+        cached = await cache.get(partition, job_description)
+        if cached is not None:
+            for project in cached:
+                yield project
+            return
+
+    parser = JsonArrayStream()
+    projects = []
+    async for chunk in llm_client.astream("project_ideas", project_messages(role, job_description)):
+        for project in parser.feed(chunk):
+            projects.append(project)
+            yield project
+        if parser.done:
+            break
+
+    if cache is not None and parser.done and projects:
+        await cache.set(partition, job_description, projects)
 
 # project_ideas = generate_project_ideas("Data Scientist", "Experience with Python, Machine Learning, Data Analysis, and statistical modeling.")
 
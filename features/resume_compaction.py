@@ -0,0 +1,137 @@
+import os
+import re
+from collections import Counter
+
+
+# Upper bound on resume text sent to an LLM, in estimated tokens (4 characters each).
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "4000"))
+
+# Page separator written by document_parser.extract_pdf_pages.
+PAGE_BREAK = "\f"
+
+# Only the first and last few lines of a page are header/footer candidates.
+EDGE_LINES = 2
+
+_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u3000]+")
+# "Page 2", "Page 2 of 3", "page 2/3" anywhere; bare "2", "- 2 -" or "2 of 3"
+# only as the first or last line of a page, since dates ("08/21") and plain
+# numbers are real content elsewhere.
+_PAGE_LABEL_RE = re.compile(r"^page\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$", re.IGNORECASE)
+_BARE_PAGE_NUMBER_RE = re.compile(r"^(?:[-–]\s*)?\d{1,3}(?:\s*[-–])?$|^\d{1,3}\s+of\s+\d{1,3}$", re.IGNORECASE)
+# A page label inside a longer header/footer line ("Jane Doe | Page 2 of 3").
+_PAGE_LABEL_SEARCH_RE = re.compile(r"\bpage\s*\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?\b", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+_BLANK_RUNS_RE = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _page_lines(page: str) -> list:
+    return [_SPACE_RE.sub(" ", line).strip() for line in page.splitlines()]
+
+
+def _edge_key(line: str) -> str:
+    # "Page 1 of 3" and "Page 2 of 3" are the same footer. Other digits are
+    # compared as-is, so "2019 - 2021" never matches "2015 - 2017".
+    line = line.lower()
+    if _PAGE_LABEL_SEARCH_RE.search(line) or _BARE_PAGE_NUMBER_RE.match(line):
+        return _DIGITS_RE.sub("#", line)
+    return line
+
+
+def _edge_indices(lines: list) -> set:
+    """Indices of the first and last EDGE_LINES non-empty lines of a page."""
+    content = [i for i, line in enumerate(lines) if line]
+    return set(content[:EDGE_LINES] + content[-EDGE_LINES:])
+
+
+def _repeated_edge_lines(pages: list) -> set:
+    """Keys of lines found at the top or bottom of at least half of the pages (and at least two)."""
+    if len(pages) < 2:
+        return set()
+
+    counts = Counter()
+    for lines in pages:
+        counts.update({_edge_key(lines[i]) for i in _edge_indices(lines)})
+
+    min_pages = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in counts.items() if count >= min_pages}
+
+
+def _join_hyphenated(lines: list) -> list:
+    """Re-joins words split across lines by hyphenation ("develop-" + "ment ...")."""
+    joined = []
+    for line in lines:
+        previous = joined[-1] if joined else ""
+        if (
+            line[:1].islower()
+            and previous.endswith("-")
+            and previous[-2:-1].isalpha()
+        ):
+            joined[-1] = previous[:-1] + line
+        else:
+            joined.append(line)
+    return joined
+
+
+def _is_page_number(line: str, at_edge: bool) -> bool:
+    return bool(_PAGE_LABEL_RE.match(line) or (at_edge and _BARE_PAGE_NUMBER_RE.match(line)))
+
+
+def truncate_to_budget(text: str, max_tokens: int = RESUME_TOKEN_BUDGET) -> str:
+    """Cuts LLM prompt text at the last line break that fits the token budget."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip()
+
+
+def compact_resume_text(text: str):
+    """
+    Deterministic clean-up of extracted resume text before it is stored or
+    sent to an LLM: collapses runs of whitespace, drops page numbers and
+    repeats of header/footer lines found on most pages and re-joins
+    hyphenated words. Nothing else is removed, and line structure is kept
+    so headings can still be detected; LLM prompts are additionally cut
+    with `truncate_to_budget`.
+
+    Returns (compacted_text, stats) where stats reports bytes and estimated
+    tokens before and after, and whether the text exceeds the prompt budget.
+    """
+    pages = [_page_lines(page) for page in text.split(PAGE_BREAK)]
+    repeated = _repeated_edge_lines(pages)
+
+    # Repeated headers often carry the candidate's name; keep the first copy.
+    # Only lines at a page edge are header/footer candidates.
+    lines, seen = [], set()
+    for page in pages:
+        keys = {i: _edge_key(page[i]) for i in _edge_indices(page)}
+        keys = {i: key for i, key in keys.items() if key in repeated}
+        # A page number may sit just inside a repeated header or footer.
+        content = [i for i, line in enumerate(page) if line and i not in keys]
+        edges = {content[0], content[-1]} if content else set()
+        for i, line in enumerate(page):
+            if line and _is_page_number(line, i in edges):
+                continue
+            if i in keys:
+                if keys[i] in seen:
+                    continue
+                seen.add(keys[i])
+            lines.append(line)
+    compacted = _BLANK_RUNS_RE.sub("\n\n", "\n".join(_join_hyphenated(lines))).strip()
+
+    bytes_before, bytes_after = len(text.encode("utf-8")), len(compacted.encode("utf-8"))
+    tokens_before, tokens_after = estimate_tokens(text), estimate_tokens(compacted)
+    stats = {
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+        "over_prompt_budget": tokens_after > RESUME_TOKEN_BUDGET,
+    }
+    return compacted, stats
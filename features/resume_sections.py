@@ -0,0 +1,132 @@
+import re
+import json
+
+
+# Words whose presence marks a document as a resume (any 3 of them).
+RESUME_KEYWORDS = [
+    "education",
+    "experience",
+    "skills",
+    "projects",
+    "certifications",
+    "summary",
+    "contact",
+    "university",
+    "college",
+    "degree"
+]
+
+MIN_RESUME_KEYWORDS = 3
+
+# Heading variants mapped onto the resume sections in SECTION_NAMES.
+SECTION_HEADINGS = {
+    "Introduction/Summary": [
+        "summary", "professional summary", "career summary", "profile", "professional profile",
+        "objective", "career objective", "about me", "career overview", "introduction",
+    ],
+    "Experience": [
+        "experience", "work experience", "professional experience", "employment history",
+        "work history", "internships", "internship experience", "internship",
+    ],
+    "Projects": [
+        "projects", "academic projects", "personal projects", "key projects", "project experience",
+    ],
+    "Education": [
+        "education", "academic background", "educational qualifications", "academic qualifications",
+        "academics",
+    ],
+    "Skills": [
+        "skills", "technical skills", "key skills", "core skills", "skill set", "skillset",
+        "core competencies", "tools and technologies", "tools & technologies",
+    ],
+    "Certifications": [
+        "certifications", "certificates", "certification", "licenses and certifications",
+        "licenses & certifications", "courses and certifications",
+    ],
+}
+
+SECTION_NAMES = [
+    "Name and Contact Information",
+    "Introduction/Summary",
+    "Experience",
+    "Projects",
+    "Education",
+    "Skills",
+    "Certifications",
+]
+
+# Below this many distinct headings the layout is too ambiguous to split without the LLM.
+MIN_SECTIONS_FOR_SPLIT = 3
+
+_KEYWORD_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, RESUME_KEYWORDS)) + r")\b")
+
+_HEADING_TO_SECTION = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# A heading is a line holding only a known title, optionally bulleted or
+# followed by a colon. Inline labels such as "Experience: 3 years" are body
+# text, not headings. Longest titles first so that "technical skills" wins
+# over "skills".
+_HEADING_RE = re.compile(
+    r"^[ \t]*[•\-*#>|]*[ \t]*("
+    + "|".join(re.escape(h) for h in sorted(_HEADING_TO_SECTION, key=len, reverse=True))
+    + r")[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def scan_resume(text: str) -> dict:
+    """
+    Single pass over the resume text with precompiled matchers.
+
+    Returns the resume keywords found, whether that is enough to accept the
+    document as a resume, and the offsets of every recognised section
+    heading as [{"section", "start", "end"}], where `start` is the heading
+    position and `end` where its body begins.
+    """
+    keywords = set(_KEYWORD_RE.findall(text.lower()))
+
+    sections = [
+        {
+            "section": _HEADING_TO_SECTION[match.group(1).lower()],
+            "start": match.start(),
+            "end": match.end(),
+        }
+        for match in _HEADING_RE.finditer(text)
+    ]
+
+    return {
+        "keywords": [k for k in RESUME_KEYWORDS if k in keywords],
+        "is_resume": len(keywords) >= MIN_RESUME_KEYWORDS,
+        "sections": sections,
+    }
+
+
+def split_sections(text: str, sections: list = None):
+    """
+    Deterministically splits a resume into the SECTION_NAMES sections
+    using heading offsets from `scan_resume` (recomputed if not given).
+    Returns None when too few headings were found to trust the split.
+    """
+    if sections is None:
+        sections = scan_resume(text)["sections"]
+
+    if len({s["section"] for s in sections}) < MIN_SECTIONS_FOR_SPLIT:
+        return None
+
+    parts = {name: [] for name in SECTION_NAMES}
+    parts["Name and Contact Information"].append(text[:sections[0]["start"]])
+
+    for current, following in zip(sections, sections[1:] + [None]):
+        body_end = following["start"] if following else len(text)
+        parts[current["section"]].append(text[current["end"]:body_end])
+
+    return {name: "\n".join(p.strip() for p in chunks if p.strip()) for name, chunks in parts.items()}
+
+
+def split_sections_json(text: str, sections: list = None):
+    split = split_sections(text, sections)
+    return json.dumps(split) if split is not None else None
@@ -0,0 +1,81 @@
+import os
+import hashlib
+from datetime import datetime
+
+from features.cache import MemoryCache
+
+
+# Stored text older than this is deleted by a MongoDB TTL index (resumes hold PII).
+RESUME_TTL_SECONDS = int(os.getenv("RESUME_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Bump whenever parsing or compaction changes what is stored; documents
+# written under another version are treated as missing and re-parsed.
+RESUME_FORMAT_VERSION = 2
+
+
+def make_resume_id(content: bytes) -> str:
+    """Content address of an uploaded file (truncated SHA-256, 128 bits)."""
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
+class ResumeStore:
+    """
+    Parsed uploads keyed by file hash, so re-uploading the same file skips
+    parsing and analyze endpoints can take a `resume_id` instead of the
+    full text. Backed by a MongoDB collection, whose documents expire
+    RESUME_TTL_SECONDS after upload, with a small per-worker LRU in front
+    of it.
+    """
+
+    def __init__(self, collection, local_entries: int = 256, local_ttl_seconds: float = 3600):
+        self.collection = collection
+        self._local = MemoryCache(local_entries, local_ttl_seconds)
+        self._index_ready = False
+
+    async def _ensure_index(self):
+        if not self._index_ready:
+            await self.collection.create_index("created_at", expireAfterSeconds=RESUME_TTL_SECONDS)
+            self._index_ready = True
+
+    async def get(self, resume_id: str):
+        record = await self._local.get(resume_id)
+        if record is not None:
+            return record
+
+        try:
+            doc = await self.collection.find_one({"_id": resume_id, "version": RESUME_FORMAT_VERSION})
+        except Exception as e:
+            print(f"Resume store lookup failed: {e}")
+            return None
+
+        if doc is None:
+            return None
+
+        record = {"text": doc["text"], "sections": doc.get("sections", [])}
+        await self._local.set(resume_id, record)
+        return record
+
+    async def put(self, resume_id: str, filename: str, text: str, sections: list) -> bool:
+        """
+        Stores a parsed upload. Returns False when the MongoDB write failed:
+        the id then only resolves on this worker, so callers should hand the
+        text back to the client instead.
+        """
+        record = {"text": text, "sections": sections}
+        await self._local.set(resume_id, record)
+
+        try:
+            await self._ensure_index()
+            await self.collection.update_one(
+                {"_id": resume_id},
+                {
+                    "$set": {**record, "filename": filename, "version": RESUME_FORMAT_VERSION},
+                    "$setOnInsert": {"created_at": datetime.utcnow()},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"Resume store write failed: {e}")
+            return False
+        return True
+
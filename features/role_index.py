@@ -0,0 +1,163 @@
+import os
+import asyncio
+import numpy as np
+
+from features.Job_match_analysis import pre_process_corrected, get_glove_model, get_document_vector
+from features.skill_extractor import skill_key
+from features.skill_matcher import covered_mask
+
+
+# Minimum cosine similarity between role-title vectors for a fuzzy match,
+# e.g. "ML Engineer" -> "Machine Learning Engineer".
+ROLE_MATCH_THRESHOLD = float(os.getenv("ROLE_MATCH_THRESHOLD", "0.9"))
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(pre_process_corrected(role))
+
+
+class RoleIndex:
+    """
+    Essential skills per role, keyed by normalized role title and persisted
+    in MongoDB. Filled lazily from LLM answers or seeded offline; unseen
+    titles are matched to known ones by GloVe similarity before falling
+    back to the LLM.
+    """
+
+    def __init__(self, collection, match_threshold: float = ROLE_MATCH_THRESHOLD):
+        self.collection = collection
+        self.match_threshold = match_threshold
+        self._requirements = {}
+        self._keys = []
+        self._matrix = None
+        # Fuzzy-matched title -> known title, so repeats skip MongoDB.
+        self._matches = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _rebuild_matrix(self):
+        model = get_glove_model()
+        if not model or not self._requirements:
+            self._keys, self._matrix = [], None
+            return
+
+        self._keys = list(self._requirements)
+        matrix = np.array([get_document_vector(key.split(), model) for key in self._keys])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self._matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    async def _load(self):
+        """Reads the persisted index once; concurrent first requests wait for the same read."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                async for doc in self.collection.find({}):
+                    self._requirements[doc["_id"]] = doc["requirements"]
+            except Exception as e:
+                print(f"Role index load failed: {e}")
+            self._rebuild_matrix()
+            self._loaded = True
+
+    def _fuzzy_match(self, key: str):
+        model = get_glove_model()
+        if self._matrix is None or not model:
+            return None
+
+        vector = get_document_vector(key.split(), model)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+
+        similarities = self._matrix @ (vector / norm)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.match_threshold:
+            return self._keys[best]
+        return None
+
+    async def lookup(self, role: str):
+        """Requirements ({category: [skills]}) for a role, or None if unknown."""
+        await self._load()
+        key = normalize_role(role)
+
+        if key in self._requirements:
+            return self._requirements[key]
+        if key in self._matches:
+            return self._requirements[self._matches[key]]
+
+        # Another worker may have learned this role since we loaded.
+        try:
+            doc = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            print(f"Role index lookup failed: {e}")
+            doc = None
+        if doc is not None:
+            self._requirements[key] = doc["requirements"]
+            self._rebuild_matrix()
+            return doc["requirements"]
+
+        match = self._fuzzy_match(key)
+        if match is None:
+            return None
+        self._matches[key] = match
+        return self._requirements[match]
+
+    async def add(self, role: str, requirements: dict):
+        key = normalize_role(role)
+        if not key:
+            return
+
+        self._requirements[key] = requirements
+        self._rebuild_matrix()
+
+        try:
+            await self.collection.replace_one(
+                {"_id": key}, {"role": role, "requirements": requirements}, upsert=True
+            )
+        except Exception as e:
+            print(f"Role index write failed: {e}")
+
+
+def subtract_skills(requirements: dict, candidate_skills: list) -> dict:
+    """
+    Per-category requirements the candidate does not already have. All
+    requirements are matched against the candidate in one batched
+    similarity pass, and a skill repeated across categories is kept once.
+    """
+    candidate = [skill for skill in candidate_skills if isinstance(skill, str)]
+    flat = [
+        (category, skill)
+        for category, skills in requirements.items() if isinstance(skills, list)
+        for skill in skills if isinstance(skill, str)
+    ]
+    covered = covered_mask([skill for _, skill in flat], candidate)
+
+    missing = {category: [] for category, skills in requirements.items() if isinstance(skills, list)}
+    seen = set()
+    for (category, skill), is_covered in zip(flat, covered):
+        key = skill_key(skill)
+        if not is_covered and key not in seen:
+            seen.add(key)
+            missing[category].append(skill)
+    return missing
+
+
+if __name__ == "__main__":
+    # Offline seeding: python -m features.role_index roles.json
+    # where roles.json is {"Data Scientist": {"Core Technical Skills": [...], ...}, ...}
+    import sys
+    import json
+    import asyncio
+    from database import db
+
+    async def seed(path):
+        index = RoleIndex(db["role_requirements"])
+        with open(path, "r", encoding="utf-8") as f:
+            roles = json.load(f)
+        for role, requirements in roles.items():
+            await index.add(role, requirements)
+        print(f"✅ Seeded {len(roles)} roles")
+
+    asyncio.run(seed(sys.argv[1]))
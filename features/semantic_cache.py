@@ -0,0 +1,166 @@
+import os
+import time
+import asyncio
+from datetime import datetime
+import numpy as np
+
+from features import llm_client
+from features.cache import make_cache_key
+from features.role_index import normalize_role
+from features.Job_match_analysis import get_glove_model, get_idf_table, get_id_matrix, tokenize_to_ids
+
+
+# Minimum cosine similarity between request embeddings to reuse an answer.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+
+
+def embed_text(text: str):
+    """Unit-length IDF-weighted GloVe document vector, or None without vectors or known tokens."""
+    model = get_glove_model()
+    if not model:
+        return None
+
+    vector = get_id_matrix([tokenize_to_ids(text, model)], model, get_idf_table(model))[0]
+    norm = np.linalg.norm(vector)
+    return (vector / norm).astype(np.float32) if norm > 0 else None
+
+
+def partition_key(feature: str, role: str) -> str:
+    """Answers are only shared between requests for the same model and role."""
+    return f"{llm_client.model_name(feature)}|{normalize_role(role)}"
+
+
+class SemanticCache:
+    """
+    LLM answers reused for near-identical requests. Entries are grouped by
+    an exact partition key (model + role) and matched on the embedding of
+    the free text (JD or skill set): a lookup returns the most similar
+    entry's value when its cosine similarity reaches `threshold`.
+
+    Embeddings live in one preallocated in-memory matrix, so a lookup is a
+    single matrix-vector product; the least recently used row is
+    overwritten when full. Entries are written through to a MongoDB
+    collection and reloaded on first use after a restart.
+    """
+
+    def __init__(self, collection, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.collection = collection
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._matrix = None
+        self._last_used = np.zeros(max_entries)
+        self._partitions = np.zeros(max_entries, dtype=np.int64)
+        self._partition_codes = {}
+        self._ids = [None] * max_entries
+        self._values = [None] * max_entries
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _code(self, partition: str) -> int:
+        return self._partition_codes.setdefault(partition, len(self._partition_codes))
+
+    def _store(self, entry_id, partition, vector, value, last_used):
+        """Writes an entry into a free row, or over the least recently used one. Returns the evicted id."""
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+        if entry_id in self._ids:
+            slot = self._ids.index(entry_id)
+        elif self._size < self.max_entries:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+
+        evicted = self._ids[slot]
+        self._matrix[slot] = vector
+        self._last_used[slot] = last_used
+        self._partitions[slot] = self._code(partition)
+        self._ids[slot] = entry_id
+        self._values[slot] = value
+        return evicted
+
+    async def _load(self):
+        """Reads persisted entries once; concurrent first requests wait for the same read."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                cursor = self.collection.find({}).sort("last_used", -1).limit(self.max_entries)
+                docs = [doc async for doc in cursor]
+            except Exception as e:
+                print(f"Semantic cache load failed: {e}")
+                docs = []
+
+            # Oldest first, so recency order survives the restart.
+            now = time.monotonic()
+            for rank, doc in enumerate(reversed(docs)):
+                vector = np.asarray(doc["vector"], dtype=np.float32)
+                self._store(doc["_id"], doc["partition"], vector, doc["value"], now - len(docs) + rank)
+            self._loaded = True
+
+    async def get(self, partition: str, text: str):
+        await self._load()
+        vector = embed_text(text)
+        code = self._partition_codes.get(partition)
+        if vector is None or code is None or self._size == 0:
+            self.misses += 1
+            return None
+
+        similarities = self._matrix[:self._size] @ vector
+        similarities[self._partitions[:self._size] != code] = -1
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._last_used[best] = time.monotonic()
+        try:
+            await self.collection.update_one(
+                {"_id": self._ids[best]}, {"$set": {"last_used": datetime.utcnow()}}
+            )
+        except Exception as e:
+            print(f"Semantic cache touch failed: {e}")
+        return self._values[best]
+
+    async def set(self, partition: str, text: str, value):
+        await self._load()
+        vector = embed_text(text)
+        if vector is None:
+            return
+
+        entry_id = make_cache_key(partition, text)
+        evicted = self._store(entry_id, partition, vector, value, time.monotonic())
+
+        try:
+            await self.collection.replace_one(
+                {"_id": entry_id},
+                {
+                    "partition": partition,
+                    "vector": vector.tolist(),
+                    "value": value,
+                    "last_used": datetime.utcnow(),
+                },
+                upsert=True,
+            )
+            if evicted not in (None, entry_id):
+                await self.collection.delete_one({"_id": evicted})
+        except Exception as e:
+            print(f"Semantic cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": "semantic",
+            "entries": self._size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
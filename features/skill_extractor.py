@@ -0,0 +1,144 @@
+import re
+import json
+
+from features.Job_match_analysis import pre_process_corrected
+from features.resume_sections import split_sections
+from features.skill_gazetteer import SKILLS, ALIASES, AMBIGUOUS
+
+
+# Below this many gazetteer hits (ignoring AMBIGUOUS entries) the local
+# result is treated as low confidence and extraction falls back to the LLM.
+MIN_LOCAL_SKILLS = 5
+
+# pre_process_corrected strips symbols, which would collapse C, C++ and C#
+# into one token; rewrite them into distinct words first.
+_SYMBOL_REWRITES = [
+    (re.compile(r"(?<![\w+])c\+\+"), " cplusplus "),
+    (re.compile(r"(?<![\w#])c#"), " csharp "),
+    (re.compile(r"(?<![\w.])\.net\b"), " dotnet "),
+]
+
+# Items of a Skills section: "Languages: Python, Go | Excel; Communication".
+_SKILL_ITEM_SPLIT_RE = re.compile(r"[,;|/•·()\[\]\n]+|\s[-–]\s")
+_SKILL_LABEL_RE = re.compile(r"^[^:,;|]{1,30}:\s*")
+# Longer items are prose, not skill names.
+MAX_SKILL_ITEM_WORDS = 4
+
+_END = object()
+
+
+def normalize_skill_text(text: str) -> list:
+    text = text.lower()
+    for pattern, replacement in _SYMBOL_REWRITES:
+        text = pattern.sub(replacement, text)
+    return pre_process_corrected(text)
+
+
+def _build_trie():
+    trie = {}
+    entries = [(name, name) for name in SKILLS] + list(ALIASES.items())
+    for phrase, canonical in entries:
+        tokens = normalize_skill_text(phrase)
+        if not tokens:
+            continue
+        node = trie
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node.setdefault(_END, (canonical, phrase in AMBIGUOUS))
+    return trie
+
+
+_SKILL_TRIE = _build_trie()
+
+
+def match_skills(tokens: list, ambiguous: bool = True) -> list:
+    """
+    Longest-match walk of the skill trie over normalized tokens. Returns
+    canonical skill names in order of first appearance; with
+    `ambiguous=False`, AMBIGUOUS gazetteer entries are not matched.
+    """
+    found = {}
+    i = 0
+    n = len(tokens)
+
+    while i < n:
+        node = _SKILL_TRIE
+        match, match_end = None, i
+        j = i
+        while j < n and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if _END in node and (ambiguous or not node[_END][1]):
+                match, match_end = node[_END][0], j
+
+        if match is None:
+            i += 1
+        else:
+            found.setdefault(match, None)
+            i = match_end
+
+    return list(found)
+
+
+def extract_skills(text: str, ambiguous: bool = True) -> list:
+    return match_skills(normalize_skill_text(text), ambiguous)
+
+
+def skill_section_items(text: str) -> list:
+    """Short comma/bullet-separated items of a Skills section, with "Label:" prefixes removed."""
+    items = []
+    for line in text.splitlines():
+        line = _SKILL_LABEL_RE.sub("", line.strip())
+        for item in _SKILL_ITEM_SPLIT_RE.split(line):
+            item = item.strip(" .:*-–")
+            if item and len(item.split()) <= MAX_SKILL_ITEM_WORDS:
+                items.append(item)
+    return items
+
+
+def extract_resume_locally(resume_text: str, sections: list = None):
+    """
+    LLM-free fast path for resume structuring and skill extraction.
+
+    Returns (sections_json, skill_list) in the same shape as the LLM
+    extraction in missing_skills, or None when the headings could not
+    be split deterministically or too few known skills were found.
+    """
+    split = split_sections(resume_text, sections)
+    if split is None:
+        return None
+
+    skills = extract_skills(resume_text, ambiguous=False)
+    if len(skills) < MIN_LOCAL_SKILLS:
+        return None
+
+    # Short names like "C" or "R" are only taken from the Skills section, and
+    # items the gazetteer does not know ("Go", "Excel", "Communication") are
+    # kept as written rather than dropped.
+    known = {skill.lower() for skill in skills}
+    for item in skill_section_items(split["Skills"]):
+        for skill in extract_skills(item) or [item]:
+            if skill.lower() not in known:
+                known.add(skill.lower())
+                skills.append(skill)
+
+    return json.dumps(split), skills
+
+
+def canonical_skill(skill: str) -> str:
+    """
+    The gazetteer name for a known skill or alias ("Pytorch", "k8s"), else
+    the input. The whole phrase must be the entry: "Docker Compose" stays
+    as it is rather than becoming "Docker".
+    """
+    node = _SKILL_TRIE
+    for token in normalize_skill_text(skill):
+        node = node.get(token)
+        if node is None:
+            return skill
+    return node[_END][0] if _END in node else skill
+
+
+def skill_key(skill: str) -> str:
+    """Comparison key for a skill name: normalized tokens of its canonical form."""
+    return " ".join(normalize_skill_text(canonical_skill(skill)))
@@ -0,0 +1,104 @@
+# Curated skill names used by the local skill extractor. Each entry is the
+# canonical spelling returned to clients; aliases map alternative spellings
+# (after normalization) onto one of these names.
+
+SKILLS = [
+    # Programming languages
+    "Python", "Java", "JavaScript", "TypeScript", "C", "C++", "C#", "Rust", "Kotlin",
+    "Swift", "Scala", "R", "MATLAB", "PHP", "Ruby", "Perl", "Dart", "Julia", "Bash",
+    "Shell Scripting", "SQL", "PL/SQL", "HTML", "CSS", "Sass", "Solidity", "Verilog", "VHDL",
+
+    # Web and backend frameworks
+    "React", "Angular", "Vue.js", "Next.js", "Node.js", "Express.js", "Django", "Flask",
+    "FastAPI", "Spring Boot", "ASP.NET", ".NET", "Laravel", "Ruby on Rails",
+    "Tailwind CSS", "Bootstrap", "jQuery", "Redux", "GraphQL", "REST APIs", "gRPC",
+    "Microservices", "WebSockets", "Flutter", "React Native", "Android", "iOS",
+
+    # Data, ML and AI
+    "Machine Learning", "Deep Learning", "Artificial Intelligence", "Natural Language Processing",
+    "Computer Vision", "Reinforcement Learning", "Generative AI", "Large Language Models",
+    "Prompt Engineering", "Retrieval-Augmented Generation", "LangChain", "LlamaIndex",
+    "Hugging Face", "Transformers", "TensorFlow", "PyTorch", "Keras", "scikit-learn",
+    "XGBoost", "LightGBM", "OpenCV", "NLTK", "spaCy", "Gensim", "Pandas", "NumPy", "SciPy",
+    "Matplotlib", "Seaborn", "Plotly", "Statistics", "Probability", "Linear Algebra",
+    "Data Analysis", "Data Visualization", "Data Science", "Data Engineering", "Data Mining",
+    "Data Structures", "Algorithms", "Feature Engineering", "Time Series Analysis",
+    "A/B Testing", "Big Data", "Apache Spark", "PySpark", "Hadoop", "Apache Kafka",
+    "Apache Airflow", "ETL", "dbt", "MLOps", "MLflow", "Jupyter",
+
+    # Databases
+    "MySQL", "PostgreSQL", "SQLite", "MongoDB", "Redis", "Cassandra", "Elasticsearch",
+    "DynamoDB", "Firebase", "Oracle Database", "Microsoft SQL Server", "Snowflake",
+    "BigQuery", "Neo4j",
+
+    # Cloud, DevOps and tools
+    "AWS", "Microsoft Azure", "Google Cloud Platform", "Docker", "Kubernetes", "Terraform",
+    "Ansible", "Jenkins", "GitHub Actions", "CI/CD", "Git", "GitHub", "GitLab", "Linux",
+    "Nginx", "Serverless", "AWS Lambda", "Amazon S3", "Amazon EC2", "Heroku", "Vercel",
+    "Prometheus", "Grafana", "Postman", "Jira", "Figma", "Selenium", "Cypress", "Jest",
+    "PyTest", "JUnit", "Unit Testing",
+
+    # Analytics and business tools
+    "Power BI", "Tableau", "Looker", "SAP", "Salesforce",
+
+    # Practices and concepts
+    "Object-Oriented Programming", "System Design", "Design Patterns", "Operating Systems",
+    "Computer Networks", "DBMS", "Agile", "Scrum", "Cybersecurity", "Cloud Computing",
+    "Distributed Systems", "Blockchain", "Embedded Systems", "Internet of Things",
+]
+
+# Alternative spellings -> canonical name (keys are matched after normalization).
+# Common English words ("go", "spring", "rest", "express", "excel") are deliberately
+# left out; they produce more false positives than matches.
+ALIASES = {
+    "ml": "Machine Learning",
+    "dl": "Deep Learning",
+    "ai": "Artificial Intelligence",
+    "nlp": "Natural Language Processing",
+    "genai": "Generative AI",
+    "llm": "Large Language Models",
+    "llms": "Large Language Models",
+    "rag": "Retrieval-Augmented Generation",
+    "huggingface": "Hugging Face",
+    "sklearn": "scikit-learn",
+    "tf": "TensorFlow",
+    "js": "JavaScript",
+    "ts": "TypeScript",
+    "golang": "Go",
+    "reactjs": "React",
+    "react js": "React",
+    "vue": "Vue.js",
+    "vuejs": "Vue.js",
+    "angularjs": "Angular",
+    "nextjs": "Next.js",
+    "springboot": "Spring Boot",
+    "restful apis": "REST APIs",
+    "rest api": "REST APIs",
+    "postgres": "PostgreSQL",
+    "mongo": "MongoDB",
+    "mssql": "Microsoft SQL Server",
+    "sql server": "Microsoft SQL Server",
+    "azure": "Microsoft Azure",
+    "gcp": "Google Cloud Platform",
+    "google cloud": "Google Cloud Platform",
+    "amazon web services": "AWS",
+    "k8s": "Kubernetes",
+    "spark": "Apache Spark",
+    "kafka": "Apache Kafka",
+    "airflow": "Apache Airflow",
+    "cicd": "CI/CD",
+    "ms excel": "Excel",
+    "microsoft excel": "Excel",
+    "advanced excel": "Excel",
+    "powerbi": "Power BI",
+    "oop": "Object-Oriented Programming",
+    "oops": "Object-Oriented Programming",
+    "dsa": "Data Structures",
+    "os": "Operating Systems",
+    "iot": "Internet of Things",
+}
+
+# Entries that also read as initials or ordinary prose ("John C. Doe",
+# "R. K. Associates", "Windows OS", "Node JS"). They are only trusted inside
+# a Skills section and never count towards the local extractor's confidence.
+AMBIGUOUS = {"C", "R", "js", "ts", "tf", "os"}
@@ -0,0 +1,36 @@
+import os
+import numpy as np
+
+from features.Job_match_analysis import get_glove_model, get_document_matrix
+from features.skill_extractor import skill_key
+
+
+# Cosine similarity above which two skill phrases are treated as the same skill.
+SKILL_MATCH_THRESHOLD = float(os.getenv("SKILL_MATCH_THRESHOLD", "0.85"))
+
+
+def phrase_matrix(skills: list, model) -> np.ndarray:
+    """Row-normalized averaged GloVe vectors, one row per skill phrase."""
+    matrix = get_document_matrix([skill_key(skill).split() for skill in skills], model)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def covered_mask(required: list, candidate: list, threshold: float = SKILL_MATCH_THRESHOLD) -> np.ndarray:
+    """
+    For each required skill, whether the candidate already has it: an exact
+    canonical-key match, or any candidate phrase above `threshold` in one
+    thresholded (required x candidate) similarity matrix.
+    """
+    if not required:
+        return np.zeros(0, dtype=bool)
+
+    candidate_keys = {skill_key(skill) for skill in candidate}
+    covered = np.array([skill_key(skill) in candidate_keys for skill in required])
+
+    model = get_glove_model()
+    if not model or not candidate:
+        return covered
+
+    similarities = phrase_matrix(required, model) @ phrase_matrix(candidate, model).T
+    return covered | (similarities >= threshold).any(axis=1)
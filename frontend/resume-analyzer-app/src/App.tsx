@@ -346,7 +346,9 @@ const AIResumeAnalyzer: React.FC = () => {
 
       // Step 2: Send processed data for specific analysis
       const analysisPayload = {
-        resume_text: processedData.resume_text,
+        resume_id: processedData.resume_id,
+        // resume_id is null when the server could not store the upload.
+        resume_text: processedData.resume_id ? undefined : processedData.resume_text,
         job_role: processedData.job_role,
         job_description: dashboardForm.jobDescription,
         location: dashboardForm.location, // Added location for job matching
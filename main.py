@@ -1,20 +1,31 @@
 from fastapi import FastAPI, HTTPException, Response, Depends, UploadFile, File, Form, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional
-import re
+from typing import List, Literal, Optional
 import json
+import time
+import asyncio
 import hashlib
 
 from database import db
 from auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES, normalize_password
 
 # Import Features
-from features.missing_skills import send_text_to_llm, retrieve_skills, generate_missing_skills, extract_text_from_file, extract_json
-from features.Job_match_analysis import calculate_ats_score
-from features.project_ideas import generate_project_ideas
-from features.interview_prep import generate_interview_questions
-from features.live_jobs import run_job_agent
+from features.missing_skills import extract_resume_skills, extraction_cache, find_missing_skills
+from features.document_parser import extract_text_async, shutdown_process_pool, ExtractionTimeout
+from features.resume_store import ResumeStore, make_resume_id
+from features.resume_sections import scan_resume
+from features.resume_compaction import compact_resume_text
+from features.role_index import RoleIndex
+from features.semantic_cache import SemanticCache
+from features.Job_match_analysis import get_glove_model, ats_report, describe_coverage, rank_ats_scores
+from features.project_ideas import generate_project_ideas_async, stream_project_ideas
+from features.interview_prep import generate_interview_questions_async, stream_interview_questions
+from features.live_jobs import run_job_agent_async, close_http_client, job_cache, job_fetches
+from features.llm_governor import LLMUnavailable
+from features import llm_client
 
 
 app = FastAPI()
@@ -29,6 +40,32 @@ app.add_middleware(
 )
 
 user_collection = db["users"]
+resume_store = ResumeStore(db["resumes"])
+role_index = RoleIndex(db["role_requirements"])
+project_ideas_cache = SemanticCache(db["semantic_project_ideas"])
+interview_prep_cache = SemanticCache(db["semantic_interview_prep"])
+
+
+@app.on_event("startup")
+async def startup():
+    # Builds (if needed) and maps the GloVe store before the first request.
+    # Missing vectors only degrade ATS scoring; they must not stop the app.
+    try:
+        await run_in_threadpool(get_glove_model)
+    except Exception as e:
+        print(f"GloVe warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_client()
+    shutdown_process_pool()
+
+
+@app.exception_handler(LLMUnavailable)
+async def llm_unavailable_handler(request, exc: LLMUnavailable):
+    headers = {'Retry-After': str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={'detail': str(exc)}, headers=headers)
 
 # --- Pydantic Models ---
 
@@ -43,11 +80,20 @@ class UserLogin(BaseModel):
 class ATSAnalysisRequest(BaseModel):
     job_role: str
     job_description: str
-    resume_text: str
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
+    mode: Literal['mean', 'idf'] = 'mean'
+
+class BatchATSAnalysisRequest(BaseModel):
+    job_role: str
+    job_description: str
+    resume_texts: List[str]
+    mode: Literal['mean', 'idf'] = 'mean'
 
 class MissingSkillsRequest(BaseModel):
     job_role: str
-    resume_text: str
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
 
 class ProjectIdeasRequest(BaseModel):
     job_role: str
@@ -56,36 +102,27 @@ class ProjectIdeasRequest(BaseModel):
 class InterviewPrepRequest(BaseModel):
     job_role: str
     resume_text: Optional[str] = None
+    resume_id: Optional[str] = None
 
 class JobMatchRequest(BaseModel):
     job_role: str
     location: str
 
 
-def check_file(text: str) -> bool:
-    """Checks if the text contains at least 3 common resume sections."""
+# Per-stage deadlines (seconds) for /api/analyze/all
+ANALYZE_ALL_TIMEOUTS = {
+    'extraction': 30,
+    'ats-score': 15,
+    'missing-skills': 60,
+    'project-ideas': 60,
+    'interview-prep': 60,
+    'job-matches': 30,
+}
 
-    keywords = [
-        "education",
-        "experience",
-        "skills",
-        "projects",
-        "certifications",
-        "summary",
-        "contact",
-        "university",
-        "college",
-        "degree"
-    ]
 
-    text_lower = text.lower()
-
-    found_keywords = 0
-    for keyword in keywords:
-        if re.search(rf"\b{re.escape(keyword)}\b", text_lower):
-            found_keywords += 1
-
-    return found_keywords >= 3
+def check_file(text: str) -> bool:
+    """Checks if the text contains at least 3 common resume sections."""
+    return scan_resume(text)["is_resume"]
 
 # async def extract_text_from_upload_file(file: UploadFile):
 #     """Extracts text from a PDF or DOCX file object."""
@@ -171,31 +208,77 @@ async def get_me(user_id: str = Depends(get_current_user)):
 
 
 
-@app.post('/api/process-resume')
-def process_resume(
-    resume: UploadFile = File(...),
-    jobRole: str = Form(...),
-    jobDescription: str = Form(default=""),
-    location: str = Form(...),
-    experience: str = Form(...)
-):
+async def read_resume_upload(resume: UploadFile):
+    """
+    Extracts, compacts and validates the text of an uploaded resume.
+    Returns (resume_id, resume_text, compaction_stats); files seen before
+    skip parsing and report no stats. resume_id is None when the upload
+    could not be stored, so clients send the text back instead.
+    """
     try:
         if not resume.filename:
              raise HTTPException(status_code=400, detail="No selected file")
 
-        resume_text = extract_text_from_file(resume)
-        
+        content = await resume.read()
+        resume_id = make_resume_id(content)
+
+        stored = await resume_store.get(resume_id)
+        if stored is not None:
+            return resume_id, stored["text"], None
+
+        resume_text = await extract_text_async(resume.filename, content)
+
+    except HTTPException:
+        raise
+    except ExtractionTimeout as e:
+        print(f"ERROR in process_resume: {str(e)}")
+        raise HTTPException(status_code=422, detail=f"Error: {str(e)}")
     except Exception as e:
         print(f"ERROR in process_resume: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
-    if not check_file(resume_text):
+    resume_text, compaction = compact_resume_text(resume_text)
+    print(f"Resume compaction saved {compaction['bytes_saved']} bytes (~{compaction['tokens_saved']} tokens)")
+
+    scan = scan_resume(resume_text)
+    if not scan["is_resume"]:
         error_message = 'The file you gave does not seem to be a valid resume. Please upload a proper resume file.'
         raise HTTPException(status_code=400, detail=error_message)
 
+    if not await resume_store.put(resume_id, resume.filename, resume_text, scan["sections"]):
+        resume_id = None
+    return resume_id, resume_text, compaction
+
+
+async def resolve_resume_text(request) -> str:
+    """Resume text from the request body, or looked up by `resume_id`."""
+    if request.resume_text:
+        return request.resume_text
+
+    if request.resume_id:
+        stored = await resume_store.get(request.resume_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Unknown resume_id. Please upload the resume again.")
+        return stored["text"]
+
+    raise HTTPException(status_code=400, detail="Provide either resume_text or resume_id")
+
+
+@app.post('/api/process-resume')
+async def process_resume(
+    resume: UploadFile = File(...),
+    jobRole: str = Form(...),
+    jobDescription: str = Form(default=""),
+    location: str = Form(...),
+    experience: str = Form(...)
+):
+    resume_id, resume_text, compaction = await read_resume_upload(resume)
+
     return {
         'message': 'Resume processed successfully',
+        'resume_id': resume_id,
         'resume_text': resume_text,
+        'compaction': compaction,
         'job_role': jobRole,
         'job_description': jobDescription,
         'location': location,
@@ -204,40 +287,40 @@ def process_resume(
 
 @app.post('/api/analyze/ats-score')
 async def analyze_ats_score(request: ATSAnalysisRequest):
-    ats_score = calculate_ats_score(request.resume_text, request.job_description)
-    
-    mock_result = { 
-        'title': 'Job Match Analysis', 
-        'score': ats_score, 
-        'details': [ 'Strong keyword optimization', 'Excellent formatting', 'Clear section headers' ] 
+    resume_text = await resolve_resume_text(request)
+    report = await run_in_threadpool(ats_report, resume_text, request.job_description, request.mode)
+
+    return {
+        'title': 'Job Match Analysis',
+        'score': report['score'],
+        'details': describe_coverage(report),
+        'covered_terms': report['covered'],
+        'missing_terms': report['missing'],
+    }
+
+@app.post('/api/analyze/ats-score/batch')
+async def analyze_ats_score_batch(request: BatchATSAnalysisRequest):
+    if not request.resume_texts:
+        raise HTTPException(status_code=400, detail="No resumes provided")
+
+    ranked = await run_in_threadpool(rank_ats_scores, request.resume_texts, request.job_description, request.mode)
+
+    return {
+        'title': 'Batch Job Match Analysis',
+        'results': ranked
     }
-    return mock_result
 
 from fastapi import HTTPException
 import json
 
 @app.post('/api/analyze/missing-skills')
 async def analyze_missing_skills(request: MissingSkillsRequest):
-    try:
-        structured_text = send_text_to_llm(request.resume_text)
-
-        skills = retrieve_skills(structured_text)
-        clean_skills = extract_json(skills)
-        print(f"Extracted Skills: {skills}")
-
-        try:
-            skill_list = json.loads(clean_skills)
-        except json.JSONDecodeError:
-            skill_list = []
+    resume_text = await resolve_resume_text(request)
 
-        missing_skills = generate_missing_skills(request.job_role, skill_list)
-        print(f"LLM Missing Skills Response: {missing_skills}")
+    try:
+        _, skill_list = await extract_resume_skills(resume_text)
 
-        try:
-            structured_response = extract_json(missing_skills)
-            structured_response = json.loads(structured_response)
-        except json.JSONDecodeError:
-            raise ValueError("LLM returned invalid JSON for missing skills")
+        structured_response = await find_missing_skills(request.job_role, skill_list, role_index)
 
         flat_list = []
         for category_skills in structured_response.values():
@@ -249,6 +332,8 @@ async def analyze_missing_skills(request: MissingSkillsRequest):
             "skills": flat_list
         }
 
+    except LLMUnavailable:
+        raise
     except Exception as e:
         print("SERVER ERROR:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -282,7 +367,9 @@ async def analyze_project_ideas(request: ProjectIdeasRequest):
     project_list = []
     
     try:
-        project_list = generate_project_ideas(request.job_role, request.job_description)
+        project_list = await generate_project_ideas_async(request.job_role, request.job_description, project_ideas_cache)
+    except LLMUnavailable:
+        raise
     except Exception as e:
         print(f"!!!!!! AN ERROR OCCURRED IN THE ROUTE: {e} !!!!!!")
         project_list = [] 
@@ -298,10 +385,10 @@ async def analyze_project_ideas(request: ProjectIdeasRequest):
 @app.post('/api/analyze/interview-prep')
 async def analyze_interview_prep(request: InterviewPrepRequest):
 
-    structured_text = send_text_to_llm(request.resume_text)
-    skills = retrieve_skills(structured_text)
+    resume_text = await resolve_resume_text(request) if request.resume_id else request.resume_text
+    _, skills = await extract_resume_skills(resume_text or "")
 
-    ques = generate_interview_questions(request.job_role, skills)
+    ques = await generate_interview_questions_async(request.job_role, skills, interview_prep_cache)
 
     json_start_index = ques.find('{')
     json_end_index = ques.rfind('}')
@@ -323,19 +410,66 @@ async def analyze_interview_prep(request: InterviewPrepRequest):
     return mock_result
 
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def sse_items(title: str, items):
+    """Relays an async iterator of items as server-sent events."""
+    yield sse_event('start', {'title': title})
+    count = 0
+    try:
+        async for item in items:
+            count += 1
+            yield sse_event('item', item)
+    except Exception as e:
+        print(f"Streaming error: {e}")
+        yield sse_event('error', {'detail': str(e), 'status': 503 if isinstance(e, LLMUnavailable) else 500})
+    yield sse_event('done', {'count': count})
+
+
+def sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.post('/api/analyze/project-ideas/stream')
+async def stream_project_ideas_route(request: ProjectIdeasRequest):
+    projects = stream_project_ideas(request.job_role, request.job_description, project_ideas_cache)
+    return sse_response(sse_items('Project Ideas for Your Profile', projects))
+
+
+@app.post('/api/analyze/interview-prep/stream')
+async def stream_interview_prep_route(request: InterviewPrepRequest):
+    resume_text = await resolve_resume_text(request) if request.resume_id else request.resume_text
+
+    async def questions():
+        _, skills = await extract_resume_skills(resume_text or "")
+        async for question in stream_interview_questions(request.job_role, skills, interview_prep_cache):
+            yield question
+
+    return sse_response(sse_items('Interview Preparation', questions()))
+
+
 @app.post('/api/analyze/job-matches')
 async def analyze_job_matches(request: JobMatchRequest):
     try:
         query = f"{request.job_role}, {request.location}"
 
-        job_list = run_job_agent(query)
+        result = await run_job_agent_async(query)
 
+        job_list = result.get('jobs')
         if not isinstance(job_list, list):
             job_list = []
 
         return {
             'title': f'Live Job Matches in {request.location}',
-            'jobs': job_list
+            'jobs': job_list,
+            'sources': result.get('sources', {}),
+            'cached': result.get('cached', False)
         }
 
     except Exception as e:
@@ -346,6 +480,106 @@ async def analyze_job_matches(request: JobMatchRequest):
         )
 
 
+async def run_analysis_stage(name: str, stage):
+    """Awaits one analysis stage under its deadline; returns (result, error, elapsed_ms)."""
+    start = time.perf_counter()
+    result, error = None, None
+    try:
+        result = await asyncio.wait_for(stage, timeout=ANALYZE_ALL_TIMEOUTS[name])
+    except asyncio.TimeoutError:
+        error = f"Timed out after {ANALYZE_ALL_TIMEOUTS[name]}s"
+    except HTTPException as e:
+        error = str(e.detail)
+    except Exception as e:
+        error = str(e)
+
+    if error:
+        print(f"Analyze-all stage '{name}' failed: {error}")
+    return result, error, round((time.perf_counter() - start) * 1000, 1)
+
+
+@app.post('/api/analyze/all')
+async def analyze_all(
+    resume: UploadFile = File(...),
+    jobRole: str = Form(...),
+    jobDescription: str = Form(default=""),
+    location: str = Form(...),
+    experience: str = Form(default="")
+):
+    resume_id, resume_text, _ = await read_resume_upload(resume)
+
+    async def extract():
+        stored = await resume_store.get(resume_id) if resume_id else None
+        await extract_resume_skills(resume_text, stored["sections"] if stored else None)
+
+    async def extract_once():
+        try:
+            await asyncio.wait_for(extract(), timeout=ANALYZE_ALL_TIMEOUTS['extraction'])
+        except Exception as e:
+            print(f"Analyze-all extraction failed: {str(e) or type(e).__name__}")
+
+    # Structure the resume once, concurrently with the stages that don't need
+    # it; the skills-based stages wait for it and then read the result from
+    # the extraction cache instead of racing to the LLM.
+    extraction = asyncio.ensure_future(extract_once())
+
+    async def after_extraction(stage):
+        # Shielded: one stage timing out must not cancel the other's wait.
+        try:
+            await asyncio.shield(extraction)
+        except asyncio.CancelledError:
+            stage.close()
+            raise
+        return await stage
+
+    stages = {
+        'ats-score': analyze_ats_score(ATSAnalysisRequest(
+            job_role=jobRole, job_description=jobDescription, resume_text=resume_text)),
+        'missing-skills': after_extraction(analyze_missing_skills(MissingSkillsRequest(
+            job_role=jobRole, resume_text=resume_text))),
+        'project-ideas': analyze_project_ideas(ProjectIdeasRequest(
+            job_role=jobRole, job_description=jobDescription)),
+        'interview-prep': after_extraction(analyze_interview_prep(InterviewPrepRequest(
+            job_role=jobRole, resume_text=resume_text))),
+        'job-matches': analyze_job_matches(JobMatchRequest(
+            job_role=jobRole, location=location)),
+    }
+
+    outcomes = await asyncio.gather(*(
+        run_analysis_stage(name, stage) for name, stage in stages.items()
+    ))
+
+    results, errors, timings = {}, {}, {}
+    for name, (result, error, elapsed_ms) in zip(stages, outcomes):
+        timings[name] = elapsed_ms
+        if error:
+            errors[name] = error
+        else:
+            results[name] = result
+
+    return {
+        'title': 'Full Resume Analysis',
+        'resume_id': resume_id,
+        'job_role': jobRole,
+        'location': location,
+        'experience': experience,
+        'results': results,
+        'errors': errors,
+        'timings_ms': timings
+    }
+
+
+@app.get('/api/cache/stats')
+async def cache_stats():
+    return {
+        'resume_extraction': extraction_cache.stats(),
+        'job_search': {**job_cache.stats(), 'coalesced': job_fetches.coalesced},
+        'project_ideas': project_ideas_cache.stats(),
+        'interview_prep': interview_prep_cache.stats(),
+        'llm': llm_client.governor_stats(),
+    }
+
+
 # BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # build_path = os.path.join(BASE_DIR, "frontend", "resume-analyzer-app", "build")
 # if os.path.isdir(build_path):
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Worker boot budget for `import main`; it measures about 0.9s.
+IMPORT_BUDGET_SECONDS = 2.0
+
+# Heavy libraries that must stay off the import path of the web app.
+LAZY_MODULES = ("nltk", "scipy", "gensim")
+
+
+def test_import_main_is_fast_and_lazy():
+    script = textwrap.dedent(f"""
+        import json, sys, time
+        start = time.perf_counter()
+        import main
+        elapsed = time.perf_counter() - start
+        loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+        print(json.dumps([elapsed, loaded]))
+    """)
+    env = {
+        **os.environ,
+        "gemini_api_key": "dummy",
+        "serpapi_api_key": "dummy",
+        "jobble_api_key": "dummy",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    elapsed, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    assert loaded == [], f"imported at startup: {loaded}"
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"import main took {elapsed:.2f}s"
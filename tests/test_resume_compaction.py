@@ -0,0 +1,50 @@
+from features.resume_compaction import PAGE_BREAK, compact_resume_text
+
+
+def two_page_resume(page_one: list, page_two: list) -> str:
+    return "\n".join(page_one) + "\n" + PAGE_BREAK + "\n".join(page_two)
+
+
+def test_date_ranges_at_page_edges_are_kept():
+    text = two_page_resume(
+        [
+            "Jane Doe",
+            "Experience",
+            "Acme Corp, Data Analyst",
+            "2019 - 2021",
+            "Globex, Intern",
+            "2017 - 2019",
+        ],
+        [
+            "2021 - 2023",
+            "Initech, Engineer",
+            "Education",
+            "BSc Computer Science",
+            "2015 - 2017",
+            "CGPA: 8.5/10",
+        ],
+    )
+    compacted, _ = compact_resume_text(text)
+    for line in ("2019 - 2021", "2017 - 2019", "2021 - 2023", "2015 - 2017", "CGPA: 8.5/10"):
+        assert line in compacted.splitlines()
+
+
+def test_repeated_headers_and_page_footers_are_dropped():
+    text = two_page_resume(
+        ["Jane Doe | jane@example.com", "Experience", "Acme Corp", "2019 - 2021", "Page 1 of 2"],
+        ["Jane Doe | jane@example.com", "Projects", "Shop app", "2021 - 2022", "Page 2 of 2"],
+    )
+    lines = compact_resume_text(text)[0].splitlines()
+    assert lines.count("Jane Doe | jane@example.com") == 1
+    assert not any(line.startswith("Page") for line in lines)
+    assert "2019 - 2021" in lines and "2021 - 2022" in lines
+
+
+def test_bare_numbers_are_only_dropped_at_page_edges():
+    text = two_page_resume(
+        ["Summary", "Graduated 08/21", "42", "Skills", "- 1 -"],
+        ["3", "Experience", "Acme Corp", "2 of 2"],
+    )
+    lines = compact_resume_text(text)[0].splitlines()
+    assert "08/21" in lines[1] and "42" in lines
+    assert "- 1 -" not in lines and "3" not in lines and "2 of 2" not in lines